@@ -0,0 +1,81 @@
+"""
+Bundle write benchmark: setting properties one by one, which checks for `env.resources` change after each,
+compared with setting them in batch_update, and set_property compared with set_runtime_property for values
+set per test. Also checks that batch in progress on one thread doesn't defer reload for other threads.
+
+    python benchmarks/bundle_batch.py [--check-only]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from qaf.automation.util.property_util import PropertyUtil
+
+PROPERTIES = 50
+ITERATIONS = 2000
+
+
+def set_each(bundle):
+    for i in range(PROPERTIES):
+        bundle.set_property(f"batch.key.{i}", "value")
+
+
+def set_in_batch(bundle):
+    with bundle.batch_update():
+        set_each(bundle)
+
+
+def measure(call, *args) -> float:
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            call(*args)
+        elapsed = (time.perf_counter() - start) / ITERATIONS
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def check_other_thread_reloads(resources_dir) -> bool:
+    """
+    Returns whether resources set by a thread get loaded immediately while other thread is in batch.
+    """
+    bundle = PropertyUtil()
+    in_batch, done = threading.Event(), threading.Event()
+
+    def batch():
+        with bundle.batch_update():
+            in_batch.set()
+            done.wait(10)
+
+    batch_thread = threading.Thread(target=batch)
+    batch_thread.start()
+    in_batch.wait(10)
+    try:
+        bundle.set_property("env.resources", resources_dir)
+        return bundle.get_string("batch.resource.key") == "loaded"
+    finally:
+        done.set()
+        batch_thread.join()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as resources_dir:
+        with open(os.path.join(resources_dir, "batch.properties"), "w") as fp:
+            fp.write("batch.resource.key=loaded\n")
+        reloaded = check_other_thread_reloads(resources_dir)
+    print(f"reload on other thread during batch: {'yes' if reloaded else 'NO'}")
+    if "--check-only" not in sys.argv:
+        bundle = PropertyUtil()
+        print(f"set {PROPERTIES} properties, each:    {measure(set_each, bundle) * 1e6:7.1f} us")
+        print(f"set {PROPERTIES} properties, batch:   {measure(set_in_batch, bundle) * 1e6:7.1f} us")
+        print(f"set_property:                {measure(bundle.set_property, 'test.name', 'name') * 1e6:7.2f} us")
+        print(f"set_runtime_property:        "
+              f"{measure(bundle.set_runtime_property, 'test.name', 'name') * 1e6:7.2f} us")
+    return 0 if reloaded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Command logging benchmark: 20,000 driver commands, 10 per step over 2,000 steps, logged into execution context
+as slotted command log and checkpoint beans. Reports time per logged command, peak memory of the test's logs
+and time to serialize them to json dict as the report does.
+
+    python benchmarks/command_logging.py [commands]
+"""
+import sys
+import time
+import tracemalloc
+
+from qaf.automation.core import test_base
+from qaf.automation.core.checkpoint_bean import CheckPointBean
+from qaf.automation.core.command_log_bean import CommandLogBean
+from qaf.automation.core.message_type import MessageType
+
+COMMANDS = 20000
+PER_STEP = 10
+
+
+def log_test(commands: int) -> None:
+    for step in range(commands // PER_STEP):
+        test_base.start_step(f"step {step}", f"Given step {step}", [step])
+        for i in range(PER_STEP):
+            test_base.add_command(CommandLogBean("findElement", ["xpath=//button[@id='submit']", i],
+                                                 {"ELEMENT": f"element-{step}-{i}"}, 3))
+        test_base.add_checkpoint(CheckPointBean(f"verify step {step}", MessageType.Pass))
+        test_base.end_step(True)
+
+
+def serialize() -> int:
+    logs = [log.to_json_dict() for log in test_base.get_command_logs()]
+    checkpoints = [checkpoint.to_json_dict() for checkpoint in test_base.get_checkpoint_results()]
+    return len(logs) + len(checkpoints)
+
+
+def best_of(call, *args, rounds: int = 3) -> float:
+    best = None
+    for _ in range(rounds):
+        test_base.new_context()
+        start = time.perf_counter()
+        call(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else COMMANDS
+    logging_time = best_of(log_test, commands)
+
+    test_base.new_context()
+    tracemalloc.start()
+    log_test(commands)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    serialize()
+    serialize_time = time.perf_counter() - start
+
+    print(f"{commands} commands, {PER_STEP} per step")
+    print(f"logging:   {logging_time / commands * 1e6:5.2f} us/command")
+    print(f"memory:    {current / 2 ** 20:5.2f} MB retained, {peak / 2 ** 20:5.2f} MB peak, "
+          f"{current / commands:.0f} bytes/command")
+    print(f"serialize: {serialize_time * 1000:5.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Execution context isolation stress test: 32 threads, released together, each run 50 steps logging a command
+and a checkpoint, failing every 10th checkpoint, and then check they see only own steps, checkpoints,
+command logs and verification errors. Same with 32 asyncio tasks starting new context.
+
+    python benchmarks/context_isolation.py
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from qaf.automation.core import test_base
+from qaf.automation.core.checkpoint_bean import CheckPointBean
+from qaf.automation.core.command_log_bean import CommandLogBean
+from qaf.automation.core.message_type import MessageType
+
+WORKERS = 32
+STEPS = 50
+FAIL_EVERY = 10
+
+
+def run_step(worker: int, i: int) -> None:
+    test_base.start_step(f"step {worker} {i}", f"step {worker} {i}")
+    test_base.add_command(CommandLogBean(f"command {worker} {i}"))
+    failed = i % FAIL_EVERY == 0
+    test_base.add_checkpoint(CheckPointBean(f"check {worker} {i}", MessageType.Fail if failed else MessageType.Pass))
+    test_base.end_step(True)
+
+
+def errors(worker: int) -> list:
+    """
+    Returns what current context has, that doesn't belong to the worker.
+    """
+    problems = []
+    checkpoints = test_base.get_checkpoint_results()
+    expected = [f"step {worker} {i}" for i in range(STEPS)]
+    if [checkpoint.message for checkpoint in checkpoints] != expected:
+        problems.append("steps")
+    elif any([sub.message for sub in checkpoint.subCheckPoints] != [f"check {worker} {i}"]
+             for i, checkpoint in enumerate(checkpoints)):
+        problems.append("checkpoints")
+    logs = list(test_base.get_command_logs())
+    if [log.commandName for log in logs] != expected or \
+            any([sub.commandName for sub in log.subLogs] != [f"command {worker} {i}"] for i, log in enumerate(logs)):
+        problems.append("command logs")
+    if test_base.get_verification_errors() != STEPS // FAIL_EVERY:
+        problems.append("verification errors")
+    return problems
+
+
+def run_threads() -> list:
+    barrier = threading.Barrier(WORKERS)
+    results = [None] * WORKERS
+
+    def worker(n):
+        barrier.wait()
+        for i in range(STEPS):
+            run_step(n, i)
+            time.sleep(0)  # let other threads interleave
+        results[n] = errors(n)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+async def run_tasks() -> list:
+    async def worker(n):
+        test_base.new_context()
+        for i in range(STEPS):
+            run_step(n, i)
+            await asyncio.sleep(0)
+        return errors(n)
+
+    return await asyncio.gather(*(worker(n) for n in range(WORKERS)))
+
+
+def report(name: str, results: list, elapsed: float) -> int:
+    corrupted = [problems for problems in results if problems]
+    print(f"{name}: {len(corrupted)} of {WORKERS} saw other's state in {elapsed * 1000:.0f} ms")
+    for problems in corrupted[:3]:
+        print(f"    {', '.join(problems)}")
+    return len(corrupted)
+
+
+def main():
+    start = time.perf_counter()
+    corrupted = report("threads", run_threads(), time.perf_counter() - start)
+    start = time.perf_counter()
+    corrupted += report("asyncio tasks", asyncio.run(run_tasks()), time.perf_counter() - start)
+    return 1 if corrupted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
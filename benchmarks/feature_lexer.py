@@ -0,0 +1,86 @@
+"""
+Feature lexer benchmark: lines per second classified by the lexer, compared with classifying each line
+using statement and step keyword patterns built per line as done before the lexer, and lines per second
+of complete feature parsing.
+
+    python benchmarks/feature_lexer.py [lines]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+
+from qaf.automation.bdd2.bdd_keywords import *
+from qaf.automation.bdd2.bdd_keywords import TAG, SCENARIO_OUTLINE
+from qaf.automation.bdd2.lexer import tokenize
+from qaf.automation.bdd2.parser import parse
+
+LINES = 50000
+ROUNDS = 5
+
+
+def feature_lines(lines: int) -> list:
+    result = ["@smoke @owner:team", "Feature: lexer benchmark", "", "Background:", "    Given application is open", ""]
+    i = 0
+    while len(result) < lines:
+        result.extend((f"@id:TC-{i}", f"Scenario Outline: scenario {i}", "    # comment",
+                       "    Given user is on '<page>' page", "    When user enters '${user}' and '${password}'",
+                       "    And user clicks on login", "    Then user should see 'welcome'",
+                       "    But error should not be displayed", "    Examples:", "      | page  |",
+                       "      | login |", "      | home  |", ""))
+        i += 1
+    return [line + "\n" for line in result[:lines]]
+
+
+def classify_per_line(lines):
+    # statement type and step check as done by parser before lexer
+    tokens = []
+    for line_no, line in enumerate(lines):
+        stmt = line.strip()
+        if stmt == "" or stmt[0] in COMMENT_CHARS:
+            continue
+        if stmt.endswith(MULTI_LINE_COMMENT) and len(set(stmt)) > 1:
+            _type = MULTI_LINE_COMMENT_END
+        else:
+            match = re.match("|".join([TAG, SCENARIO_OUTLINE, SCENARIO, STEP_DEF, EXAMPLES, FEATURE, BACKGROUND,
+                                       MULTI_LINE_COMMENT]), stmt, re.I)
+            _type = match.group() if match else ""
+        is_step = not _type and re.match("|".join(STEP_TYPES), stmt, re.I) is not None
+        tokens.append((line_no, stmt, _type, is_step))
+    return tokens
+
+
+def classify_with_lexer(lines):
+    return [(token.line_no, token.stmt, token.type, token.is_step) for token in tokenize(lines)]
+
+
+def lines_per_sec(call, arg, lines: int) -> float:
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        call(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return lines / best
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else LINES
+    text = feature_lines(lines)
+    assert classify_per_line(text) == classify_with_lexer(text), "lexer classifies lines differently"
+    fd, path = tempfile.mkstemp(suffix=".feature")
+    try:
+        with os.fdopen(fd, "w") as fp:
+            fp.writelines(text)
+        print(f"{lines} lines, best of {ROUNDS}")
+        print(f"classify, patterns per line: {lines_per_sec(classify_per_line, text, lines) / 1000:7.0f}k lines/sec")
+        print(f"classify, lexer:             {lines_per_sec(classify_with_lexer, text, lines) / 1000:7.0f}k lines/sec")
+        print(f"parse feature:               {lines_per_sec(parse, path, lines) / 1000:7.0f}k lines/sec")
+    finally:
+        os.remove(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
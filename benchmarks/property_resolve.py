@@ -0,0 +1,121 @@
+"""
+Property resolution benchmark: repeated get of plain and interpolated values served from resolved value cache,
+compared with resolving raw value on each call, and a consistency check changing a referred key from other
+thread while dependent key is being resolved, after which cached value must match freshly resolved value.
+
+    python benchmarks/property_resolve.py [--check-only]
+"""
+import sys
+import threading
+import time
+
+from qaf.automation.util.property_util import PropertyUtil
+
+ITERATIONS = 2000
+CHECK_ROUNDS = 50
+READERS = 8
+
+
+class UncachedBundle(PropertyUtil):
+    """
+    Resolves value on each get, as before resolved values were cached.
+    """
+
+    def get(self, key: str, default=None):
+        value = self.get_raw_value(key)
+        return default if value is None else self.resolve(value)
+
+
+def new_bundle(levels: int = 10, bundle_type=PropertyUtil) -> PropertyUtil:
+    bundle = bundle_type()
+    bundle.set_property("plain", "value")
+    bundle.set_property("level.0", "base")
+    for level in range(1, levels + 1):
+        if level % 2:
+            bundle.set_property(f"level.{level}", "${level.%d}-%d" % (level - 1, level))
+        else:
+            bundle.set_property(f"level.{level}", "<%%'${level.%d}' + '-%d'%%>" % (level - 1, level))
+    return bundle
+
+
+def fresh(bundle, key):
+    copy = UncachedBundle()
+    copy.update(dict.items(bundle))
+    return copy.get(key)
+
+
+def measure(call, bundle, key) -> float:
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            call(bundle, key)
+        elapsed = (time.perf_counter() - start) / ITERATIONS
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class InterleavedBundle(PropertyUtil):
+    """
+    Changes a key from other thread while value is being resolved, once.
+    """
+    change = None
+
+    def resolve(self, value, disc=None):
+        resolved = super().resolve(value, disc)
+        if self.change is not None:
+            change, self.change = self.change, None
+            writer = threading.Thread(target=self.set_property, args=change)
+            writer.start()
+            writer.join()
+        return resolved
+
+
+def check_concurrent_changes() -> int:
+    """
+    Returns number of cases in which cached value was outdated after all changes were done.
+    """
+    stale = 0
+    for key in ("level.1", "level.2", "level.3"):
+        bundle = InterleavedBundle()
+        bundle.update(new_bundle(3).items())
+        bundle.change = ("level.0", "changed")
+        bundle.get(key)
+        stale += bundle.get(key) != fresh(bundle, key)
+
+    for round_no in range(CHECK_ROUNDS):
+        bundle = new_bundle(3)
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                bundle.get("level.3")
+                time.sleep(0)
+
+        readers = [threading.Thread(target=read) for _ in range(READERS)]
+        for reader in readers:
+            reader.start()
+        for i in range(20):
+            bundle.set_property("level.0", f"base{round_no}-{i}")
+            time.sleep(0)
+        done.set()
+        for reader in readers:
+            reader.join()
+        stale += bundle.get("level.3") != fresh(bundle, "level.3")
+    return stale
+
+
+def main():
+    stale = check_concurrent_changes()
+    print(f"outdated cached values after concurrent changes: {stale}")
+    if "--check-only" not in sys.argv:
+        bundle, uncached = new_bundle(), new_bundle(bundle_type=UncachedBundle)
+        for name, key in (("plain value", "plain"), ("3 level chain", "level.3"), ("10 level chain", "level.10")):
+            assert bundle.get(key) == uncached.get(key)
+            print(f"{name:15} resolve each call: {measure(UncachedBundle.get, uncached, key) * 1e6:7.2f} us, "
+                  f"cached: {measure(PropertyUtil.get, bundle, key) * 1e6:5.2f} us")
+    return 1 if stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
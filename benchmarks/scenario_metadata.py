@@ -0,0 +1,112 @@
+"""
+Scenario metadata memory benchmark: parses synthetic feature with 20 feature tags and 50,000 scenarios,
+reads metadata of each scenario as collection does (filter expression, metadata marker, test data),
+and reports time and retained memory of scenario metadata layered over shared feature metadata
+compared with copying mutable feature metadata on read and with copying whole feature metadata
+into each scenario.
+
+    python benchmarks/scenario_metadata.py [scenarios]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from copy import deepcopy
+
+from qaf.automation.bdd2.factory import should_include
+from qaf.automation.bdd2.model import LayeredMetadata
+from qaf.automation.bdd2.parser import parse
+
+SCENARIOS = 50000
+FEATURE_TAGS = 20
+FILTER = "smoke and not slow"
+
+
+class CopyOnReadMetadata(LayeredMetadata):
+    """
+    Copies mutable value of shared layer to own layer on first read.
+    """
+
+    def __getitem__(self, key):
+        own = self.maps[0]
+        if key in own:
+            return own[key]
+        value = super().__getitem__(key)
+        if isinstance(value, (list, dict, set)):
+            value = own[key] = deepcopy(value)
+        return value
+
+
+def feature_text(scenarios: int) -> str:
+    half = FEATURE_TAGS // 2
+    tags = " ".join([f"@tag{i}" for i in range(half - 1)] + [f"@key{i}:value {i}" for i in range(half - 1)])
+    lines = [f"@smoke @owner:team {tags}", "Feature: metadata benchmark", ""]
+    for i in range(scenarios):
+        if i % 2:
+            lines.append(f"@id:TC-{i}")  # key value only, groups come from feature
+        else:
+            lines.append(f"@regression @id:TC-{i}")
+        lines.extend((f"Scenario: scenario {i}", "    Given benchmark step", ""))
+    return "\n".join(lines)
+
+
+def read_metadata(feature):
+    included = 0
+    for scenario in feature.scenarios:
+        included += should_include(FILTER, scenario)
+        dict(**scenario.metadata)
+        scenario.has_dataprovider
+    return included
+
+
+def as_copy_on_read(feature):
+    shared = {k: list(v) if isinstance(v, tuple) else v for k, v in feature.metadata.items()}
+    for scenario in feature.scenarios:
+        scenario.metadata = CopyOnReadMetadata(scenario.metadata.maps[0], shared)
+
+
+def as_full_copy(feature):
+    shared = {k: list(v) if isinstance(v, tuple) else v for k, v in feature.metadata.items()}
+    for scenario in feature.scenarios:
+        scenario.metadata = deepcopy(shared) | deepcopy(scenario.metadata.maps[0])
+
+
+def measure(path, variant=None):
+    def run():
+        feature = parse(path)
+        if variant:
+            variant(feature)
+        return feature, read_metadata(feature)
+
+    start = time.perf_counter()
+    _, included = run()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    feature, _ = run()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return included, elapsed, retained
+
+
+def main():
+    scenarios = int(sys.argv[1]) if len(sys.argv) > 1 else SCENARIOS
+    fd, path = tempfile.mkstemp(suffix=".feature")
+    try:
+        with os.fdopen(fd, "w") as fp:
+            fp.write(feature_text(scenarios))
+        results = {}
+        for name, variant in (("layered, shared tuples", None), ("layered, copy on read", as_copy_on_read),
+                              ("copy per scenario", as_full_copy)):
+            results[name] = measure(path, variant)
+        assert len({included for included, _, _ in results.values()}) == 1, "filter results differ"
+        print(f"{scenarios} scenarios, {FEATURE_TAGS} feature tags, filter '{FILTER}'")
+        for name, (included, elapsed, retained) in results.items():
+            print(f"{name:24} {elapsed * 1000:7.0f} ms {retained / 2 ** 20:7.1f} MiB retained")
+    finally:
+        os.remove(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Per step overhead benchmark: binding step arguments through cached call plan, compared with
+introspecting step function signature on each call as done before call plans, and complete execution
+of a trivial BDD2 step.
+
+    python benchmarks/step_call.py
+"""
+import sys
+import time
+
+from qaf.automation.bdd2.bddstep_executor import execute_step
+from qaf.automation.bdd2.qaf_teststep import QAFTestStep, _CallPlan
+
+ITERATIONS = 20000
+
+
+@QAFTestStep(description="benchmark user enters '{user}' and '{password}' in {field}")
+def benchmark_step(user, password, field, timeout=10):
+    pass
+
+
+def per_call_introspection(func, args):
+    # signature is looked up for each invocation
+    return _CallPlan(func).bind(args, {})
+
+
+def cached_plan(func, args):
+    return benchmark_step._call_plan.bind(args, {})
+
+
+def measure(call, *args) -> float:
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            call(*args)
+        elapsed = (time.perf_counter() - start) / ITERATIONS
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    args = ("admin", "secret", "login")
+    expected = {"user": "admin", "password": "secret", "field": "login", "timeout": 10}
+    assert per_call_introspection(benchmark_step.func, args) == expected
+    assert cached_plan(benchmark_step.func, args) == expected
+    step = "benchmark user enters 'admin' and 'secret' in login"
+    print(f"bind args, signature per call: {measure(per_call_introspection, benchmark_step.func, args) * 1e6:6.1f} us")
+    print(f"bind args, cached call plan:   {measure(cached_plan, benchmark_step.func, args) * 1e6:6.1f} us")
+    print(f"execute_step:                  {measure(execute_step, step) * 1e6:6.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Step lookup benchmark: indexed StepRegistry.lookup against linear scan over registered step definitions.
+
+Checks that indexed lookup finds same step definition as linear scan, for generated steps and for
+cases that need care (non ascii text, regex pattern matching only start of step text), and reports
+lookup time for 100 to 10,000 step definitions.
+
+    python benchmarks/step_lookup.py [--check-only]
+"""
+import sys
+import time
+
+from behave import matchers
+
+from qaf.automation.bdd2.qaf_teststep import QAFTestStep
+from qaf.automation.bdd2.step_registry import StepRegistry, check_match, step_registry
+
+SIZES = (100, 1000, 10000)
+VERBS = ("click", "verify", "open", "type", "select", "wait", "store", "assert", "drag", "scroll")
+NOUNS = ("button", "link", "page", "field", "table", "menu", "dialog", "row", "image", "tab")
+
+
+def linear_lookup(registry, step_text):
+    for step_definition in registry.registry:
+        match = check_match(step_definition, step_text)
+        if match:
+            return step_definition, match
+    return None, None
+
+
+def _step(description):
+    def step_func(**kwargs):
+        pass
+
+    step_func.__name__ = "step_%d" % abs(hash(description))
+    return QAFTestStep(description, func=step_func)
+
+
+def new_registry(definitions):
+    registry = StepRegistry()
+    for description, matcher in definitions:
+        matchers.use_step_matcher(matcher)
+        try:
+            registry.register_step(_step(description))
+        finally:
+            matchers.use_step_matcher("parse")
+    return registry
+
+
+def generated_definitions(size):
+    definitions = []
+    for i in range(size):
+        verb, noun = VERBS[i % len(VERBS)], NOUNS[(i // len(VERBS)) % len(NOUNS)]
+        if i % 5 == 4:
+            definitions.append((r"user %s %s number %d with (?P<value>.+)" % (verb, noun, i), "re"))
+        else:
+            definitions.append(("user %s %s number %d with '{value}'" % (verb, noun, i), "parse"))
+    return definitions
+
+
+def generated_steps(size, count=200):
+    return ["user %s %s number %d with 'x'" % (VERBS[i % len(VERBS)], NOUNS[(i // len(VERBS)) % len(NOUNS)], i)
+            for i in range(0, size, max(1, size // count))] + ["user does something unknown"]
+
+
+# (definitions, step texts) where indexed lookup needs to agree with linear scan
+EDGE_CASES = (
+    # cucumber regex only needs to match start of step text, unless ending with $
+    ([("I click", "re0"), ("I clicked the button", "parse")], ["I clicked the button", "I click"]),
+    ([("I click the", "re0"), ("I click them", "parse")], ["I click them", "I click the"]),
+    ([("^I click$", "re0"), ("I clicked the button", "parse")], ["I clicked the button", "I click"]),
+    ([(r"I click the (?P<name>\w+)", "re0")], ["I click the button", "I click them"]),
+    ([("I click", "re"), ("I clicked the button", "parse")], ["I clicked the button", "I click"]),
+    # non ascii word under trie node having children
+    ([("response should have '{value}' at '{path}'", "parse"), ("response should be ok", "parse")],
+     ["response should have 'café' at 'a.b'", "response should have 'x' at 'a.b'"]),
+    ([("I see {text}", "parse"), ("I see the page", "parse")], ["I see é", "I see the page", "I see ünïcode text"]),
+)
+
+
+def check(registry, step_texts) -> list:
+    mismatches = []
+    for step_text in step_texts:
+        indexed, _ = registry.lookup(step_text)
+        expected, _ = linear_lookup(registry, step_text)
+        if indexed is not expected:
+            mismatches.append((step_text, expected and expected.description, indexed and indexed.description))
+    return mismatches
+
+
+def check_all() -> list:
+    mismatches = []
+    for definitions, step_texts in EDGE_CASES:
+        mismatches += check(new_registry(definitions), step_texts)
+    # built-in steps
+    mismatches += check(step_registry, ["response should have 'café' at 'a.b'",
+                                         "response should have 'value' at 'a.b'"])
+    for size in SIZES:
+        mismatches += check(new_registry(generated_definitions(size)), generated_steps(size, 50))
+    return mismatches
+
+
+def measure(lookup, registry, step_texts, repeat=3) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for step_text in step_texts:
+            lookup(registry, step_text)
+        elapsed = (time.perf_counter() - start) / len(step_texts)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(args):
+    mismatches = check_all()
+    for step_text, expected, indexed in mismatches:
+        print(f"MISMATCH {step_text!r}: linear {expected!r}, indexed {indexed!r}")
+    print(f"correctness: {'FAILED' if mismatches else 'ok'}")
+    if "--check-only" not in args:
+        for size in SIZES:
+            registry = new_registry(generated_definitions(size))
+            step_texts = generated_steps(size)
+            indexed = measure(StepRegistry.lookup, registry, step_texts)
+            linear = measure(linear_lookup, registry, step_texts, repeat=1)
+            print(f"{size:6} definitions: indexed {indexed * 1e6:8.1f} us/lookup, linear {linear * 1e6:9.1f} us/lookup")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
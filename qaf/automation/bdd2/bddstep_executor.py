@@ -1,4 +1,3 @@
-import inspect
 import re
 
 from qaf.automation.bdd2.qaf_teststep import StepTracker
@@ -6,6 +5,7 @@ from qaf.automation.bdd2.step_registry import step_registry
 from qaf.automation.core.message_type import MessageType
 from qaf.automation.core.qaf_exceptions import StepNotFound
 from qaf.automation.core.reporter import Reporter
+from qaf.automation.core.test_base import get_step_tracker, set_step_tracker
 from qaf.automation.keys import FIXTURE_NAME
 
 """
@@ -30,11 +30,16 @@ def execute_step(bdd_step_call, testdata=None, is_dryrun_mode: bool = False, sho
         execution_tracker = StepTracker(name=bdd_step.name, display_name=f'{bdd_step.keyword} {bdd_step.name}'.lstrip(),
                                         dryrun=is_dryrun_mode, args=[], kwargs=args_dict, metadata=step.metadata)
         execution_tracker.call = bdd_step
-        bdd_step.stepTracker = execution_tracker
-        # if args_dict:
-        #     step.executeWithContext(context, **args_dict)
-        # else:
-        step.execute_with_context(execution_tracker)
+        # bdd step is shared by threads running same scenario, tracker belongs to execution context
+        parent_tracker = get_step_tracker()
+        set_step_tracker(execution_tracker)
+        try:
+            # if args_dict:
+            #     step.executeWithContext(context, **args_dict)
+            # else:
+            step.execute_with_context(execution_tracker)
+        finally:
+            set_step_tracker(parent_tracker)
 
 
 def _gen_code_snipet(bdd_step):
@@ -52,18 +57,21 @@ def _find_match(bdd_step_call, testdata):
     bdd_step_call = _convertPrameter(bdd_step_call)
     bdd_step_call = CM.get_bundle().resolve(bdd_step_call, testdata or {})
 
-    res, match = step_registry.lookup(bdd_step_call)
+    cached = step_registry.match_cache.get(bdd_step_call)
+    if cached is None:
+        res, match = step_registry.lookup(bdd_step_call)
+        cached = (res, _args_from_match(match) if res else None)
+        step_registry.match_cache.put(bdd_step_call, *cached)
+    res, args_dict = cached
 
     if res:
-        args_dict = _args_from_match(match)
-        return True, res, args_dict
+        return True, res, args_dict.copy()
 
     return False, None, None
 
 
 def _args_from_match(match):
     args = match.arguments
-    argSpec = inspect.getfullargspec(match.func)
     args_dict = {}
     for arg in args:
         args_dict[arg.name] = arg.value.strip("'")
@@ -6,7 +6,8 @@ from _pytest import nodes, fixtures
 from simpleeval import NameNotDefined, EvalWithCompoundTypes
 
 from qaf.automation.bdd2.model import Bdd2Scenario, Bdd2Background
-from qaf.automation.bdd2.parser import parse
+from qaf.automation.bdd2.feature_cache import load_feature
+from qaf.automation.util.expression_util import parse_expression
 from qaf.pytest import metadata, OPT_METADATA_FILTER, OPT_DRYRUN
 
 """
@@ -24,12 +25,16 @@ def update_item(items: list, background_names: list, scenario):
                 item.add_marker(group)
 
 
+# reused for each scenario, only names differ
+_filter_evaluator = EvalWithCompoundTypes()
+
+
 def should_include(expr, scenario) -> bool:
     if not expr:
         return True
     try:
-        evaluator = EvalWithCompoundTypes(names=scenario.metadata)
-        return evaluator.eval(expr)
+        _filter_evaluator.names = scenario.metadata
+        return _filter_evaluator.eval(expr, parse_expression(expr))
     except NameNotDefined:
         return False
 
@@ -80,7 +85,7 @@ class BDD2File(pytest.Module):
     def collect(self):
         # self.add_marker("metadata")
         values: List[Union[nodes.Item, nodes.Collector]] = []
-        self.feature = parse(self.path)
+        self.feature = load_feature(self.path)
         self.feature.node = self
         self.is_dryrun_mode = self.config.getoption(OPT_DRYRUN)
         meta_filter = self.config.getoption(OPT_METADATA_FILTER, "")
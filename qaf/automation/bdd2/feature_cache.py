@@ -0,0 +1,146 @@
+import hashlib
+import logging
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from qaf.automation.bdd2.model import Bdd2Feature
+from qaf.automation.bdd2.parser import parse_feature
+from qaf.automation.bdd2.qaf_teststep import QAFTestStep
+from qaf.automation.core import get_bundle
+from qaf.automation.keys.application_properties import ApplicationProperties
+from qaf.automation.util.cache_util import get_cache_dir, file_signature, check_signature, load_pickle, write_pickle
+
+"""
+Persistent cache of parsed BDD2 features, similar to pytest assertion rewrite cache.
+Cache entry is keyed by feature file path and validated with size, mtime and content hash,
+so collection of unchanged feature file doesn't need to parse it again.
+Features can also be parsed up front in process pool, using `preparse_features`, before collection consumes them.
+"""
+
+# change when parsed model changes, to discard entries from older version
+CACHE_VERSION = f'5-{sys.version_info[0]}.{sys.version_info[1]}'
+# below this many features per worker, starting process pool costs more than it saves
+MIN_FEATURES_PER_WORKER = 20
+# parsed by preparse_features and not yet consumed by collection
+_preparsed = {}
+
+
+def load_feature(path) -> Bdd2Feature:
+    """
+    Returns parsed feature from cache when feature file is unchanged, otherwise parses and caches it.
+    """
+    feature = _preparsed.pop(_key(path), None)
+    if feature is not None:
+        _register_step_definitions(feature)
+        return feature
+    if not get_bundle().get_boolean(ApplicationProperties.FEATURE_CACHE, True):
+        return parse_feature(path)[0]
+    feature, uses_env, restored = _read_or_parse(path)
+    if restored:
+        _register_step_definitions(feature)
+    return feature
+
+
+def preparse_features(paths, workers: int = 0) -> int:
+    """
+    Parses features in process pool, so that `load_feature` returns them without parsing.
+    Does nothing when there are not enough features for more than one worker.
+    Returns number of features parsed up front.
+    """
+    paths = list(paths)
+    workers = min(workers or os.cpu_count() or 1, len(paths) // MIN_FEATURES_PER_WORKER)
+    if workers < 2:
+        return 0
+    bundle = get_bundle()
+    properties = {key: bundle.get_raw_value(key) for key in
+                  (ApplicationProperties.FEATURE_CACHE, ApplicationProperties.CACHE_DIR)
+                  if bundle.contains_key(key)}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(properties,)) as executor:
+            chunk_size = max(1, len(paths) // (workers * 4))
+            for path, feature in zip(paths, executor.map(_parse_in_worker, paths, chunksize=chunk_size)):
+                if feature is not None:
+                    _preparsed[_key(path)] = feature
+    except Exception:
+        # features not available from pool get parsed during collection
+        logging.getLogger().exception("Unable to parse features in parallel")
+    return len(_preparsed)
+
+
+def discard_preparsed():
+    """
+    Releases features parsed up front but not consumed by collection.
+    """
+    _preparsed.clear()
+
+
+def _init_worker(properties: dict):
+    with get_bundle().batch_update() as bundle:
+        for key, value in properties.items():
+            bundle.set_property(key, value)
+
+
+def _parse_in_worker(path):
+    try:
+        if get_bundle().get_boolean(ApplicationProperties.FEATURE_CACHE, True):
+            feature, uses_env, restored = _read_or_parse(path)
+        else:
+            feature, uses_env = parse_feature(path)
+    except Exception:
+        # reported when parsed during collection
+        return None
+    # worker may not have same configuration as main process
+    return None if uses_env else feature
+
+
+def _read_or_parse(path) -> tuple:
+    """
+    Returns feature, whether it depends on environment configuration and whether it was restored from cache.
+    """
+    try:
+        cache_file = _cache_file(path)
+    except OSError:
+        # cache dir not writable
+        return *parse_feature(path), False
+
+    entry = load_pickle(cache_file)
+    if entry and entry[0] == CACHE_VERSION:
+        signature, feature = entry[1], entry[2]
+        current = check_signature(path, signature)
+        if current is not None:
+            if current is not signature:
+                # touched but same content
+                _save(cache_file, current, feature)
+            return feature, False, True
+
+    # signature before parsing, so change during parsing gets detected next time
+    signature = file_signature(path)
+    feature, uses_env = parse_feature(path)
+    if not uses_env:
+        _save(cache_file, signature, feature)
+    return feature, uses_env, False
+
+
+def _register_step_definitions(feature: Bdd2Feature):
+    for step_def in feature.step_definitions:
+        QAFTestStep(step_def.name)(step_def)
+
+
+def _key(path) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _cache_file(path) -> str:
+    key = hashlib.sha1(_key(path).encode('UTF-8')).hexdigest()
+    return os.path.join(get_cache_dir("features"), key + ".pickle")
+
+
+def _save(cache_file, signature, feature):
+    try:
+        write_pickle(cache_file, (CACHE_VERSION, signature, feature))
+    except (OSError, pickle.PicklingError):
+        # continue without cache
+        pass
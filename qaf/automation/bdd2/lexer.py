@@ -0,0 +1,67 @@
+import re
+from typing import NamedTuple, Iterable, Iterator
+
+from qaf.automation.bdd2.bdd_keywords import *
+from qaf.automation.bdd2.bdd_keywords import TAG, SCENARIO_OUTLINE
+
+"""
+Tokenizer for BDD2 feature file. Each line is classified once, using single precompiled pattern,
+into token carrying statement type and, for step, its keyword.
+"""
+
+_STATEMENT_TYPES = (TAG, SCENARIO_OUTLINE, SCENARIO, STEP_DEF, EXAMPLES, FEATURE, BACKGROUND, MULTI_LINE_COMMENT)
+_STATEMENT_PATTERN = re.compile(
+    "(?P<type>%s)|(?P<step>%s)" % ("|".join(map(re.escape, _STATEMENT_TYPES)), "|".join(STEP_TYPES)), re.I)
+_STEP_PATTERN = re.compile("|".join(STEP_TYPES), re.I)
+
+
+class Token(NamedTuple):
+    line_no: int
+    stmt: str
+    # statement keyword as in feature file, MULTI_LINE_COMMENT_END or empty for other statements
+    type: str = ""
+    # step keyword as in feature file, empty when statement is not step
+    keyword: str = ""
+
+    @property
+    def is_step(self) -> bool:
+        return not self.type and self.keyword != ""
+
+    @property
+    def text(self) -> str:
+        """
+        statement without keyword
+        """
+        if self.keyword:
+            return _remove_keyword(self.stmt, self.keyword)
+        return self.stmt.split(":", 1)[1].strip()
+
+
+def tokenize(lines: Iterable[str]) -> Iterator[Token]:
+    for line_no, line in enumerate(lines):
+        stmt = line.strip()
+        if stmt == "" or stmt[0] in COMMENT_CHARS:
+            continue
+        if stmt.endswith(MULTI_LINE_COMMENT) and len(set(stmt)) > 1:  # contains other than comment char
+            yield Token(line_no, stmt, MULTI_LINE_COMMENT_END)
+            continue
+        match = _STATEMENT_PATTERN.match(stmt)
+        if match is None:
+            yield Token(line_no, stmt)
+        elif match.lastgroup == "type":
+            yield Token(line_no, stmt, match.group())
+        else:
+            yield Token(line_no, stmt, keyword=match.group())
+
+
+def split_step(stmt: str) -> tuple:
+    """
+    Returns step keyword and step text of step statement.
+    """
+    match = _STEP_PATTERN.match(stmt)
+    keyword = match.group() if match else ""
+    return keyword, _remove_keyword(stmt, keyword)
+
+
+def _remove_keyword(stmt: str, keyword: str) -> str:
+    return stmt.replace(keyword, "").strip()
@@ -1,14 +1,17 @@
 import re
+from collections import ChainMap
 from dataclasses import field, dataclass
 from typing import TypeVar
 
 from qaf.automation.bdd2.bdd_keywords import *
 from qaf.automation.bdd2.bddstep_executor import execute_step
+from qaf.automation.bdd2.lexer import Token, split_step
 from qaf.automation.core.qaf_exceptions import ParseError
-from qaf.automation.util.csv_util import get_list_of_map
+from qaf.automation.util.csv_util import iter_maps, DataTable
 
 Bdd2Node = TypeVar("Bdd2Node", bound="Bdd2Node")
 T = TypeVar('T')
+_CELL_SEPARATOR = re.compile(r'(\s+)?\|(\s+)?')
 
 
 @dataclass
@@ -23,10 +26,12 @@ class Bdd2Node:
 class SupportsBdd2DataTable:
     _data_rows: list[str] = field(default_factory=list)
     header_cnt: int = 0
+    _table: DataTable = field(default=None, init=False, repr=False, compare=False)
 
     def add_data_row(self, row: str):
-        col_cnt = len(re.findall(r'(\s+)?\|(\s+)?', row))
-        data_row = re.sub(r'(\s+)?\|(\s+)?', "|", row[1:-1])  # to csv
+        col_cnt = len(_CELL_SEPARATOR.findall(row))
+        data_row = _CELL_SEPARATOR.sub("|", row[1:-1])  # to csv
+        self._table = None
         if self.header_cnt > 0:
             if self.header_cnt != col_cnt:
                 raise ParseError(f"col count mismatch in data table")
@@ -37,7 +42,34 @@ class SupportsBdd2DataTable:
 
     @property
     def data_table(self):
-        return get_list_of_map(self._data_rows, '|') if self._data_rows else None
+        table = self.table
+        return table.to_list() if table else None
+
+    @property
+    def table(self) -> DataTable:
+        """
+        parsed data table, rows are created when accessed
+        """
+        if not self._data_rows:
+            return None
+        if self._table is None:
+            self._table = DataTable(iter_maps(self._data_rows, '|'))
+        return self._table
+
+
+class LayeredMetadata(ChainMap):
+    """
+    Metadata of node layered over metadata shared with other nodes, for instance scenario metadata over feature
+    metadata. Updates go to own layer only. Shared layer is expected to hold immutable values (see shared_metadata),
+    so reading a value neither copies it nor allows to modify shared layer through this mapping.
+    """
+
+
+def shared_metadata(metadata: dict) -> dict:
+    """
+    Returns copy of metadata to be shared by nodes using LayeredMetadata, list and set values converted to tuple.
+    """
+    return {k: tuple(v) if isinstance(v, (list, set)) else v for k, v in metadata.items()}
 
 
 @dataclass
@@ -57,8 +89,9 @@ class Bdd2Examples(Bdd2Node, SupportsBdd2DataTable, SupportsBdd2Metadata): ...
 class Bdd2Step(Bdd2Node, SupportsBdd2DataTable):
     @property
     def name(self):
-        if self.data_table:
-            return f'{self._name} {self.data_table}'
+        table = self.table
+        if table:
+            return f'{self._name} {table.text}'
         return self._name
 
     @property
@@ -72,9 +105,14 @@ class Bdd2Step(Bdd2Node, SupportsBdd2DataTable):
     @name.setter
     def name(self, value):
         self._displayName = value
-        match = re.match("|".join(STEP_TYPES), value, re.I)
-        self._keyword = match.group() if match else ""
-        self._name = value.replace(self.keyword, "").strip()
+        self._keyword, self._name = split_step(value)
+
+    @classmethod
+    def from_token(cls, token: Token, parent=None):
+        # keyword is already split by lexer
+        step = cls(lineNo=token.line_no, parent=parent)
+        step._displayName, step._keyword, step._name = token.stmt, token.keyword, token.text
+        return step
 
     def execute(self, testdata=None, is_dryrun_mode: bool = False, should_skip=False):
         if testdata is None:
@@ -83,7 +121,8 @@ class Bdd2Step(Bdd2Node, SupportsBdd2DataTable):
 
     def __deepcopy__(self, memo):
         # Exclude the parent reference during deepcopy
-        new_obj = type(self)(name=self.display_name, lineNo=self.lineNo)
+        new_obj = type(self)(lineNo=self.lineNo)
+        new_obj._displayName, new_obj._keyword, new_obj._name = self._displayName, self._keyword, self._name
         memo[id(self)] = new_obj
         # new_obj.parent=self.parent
         return new_obj
@@ -98,15 +137,16 @@ class Bdd2StepCollection(Bdd2Node):
     def execute(self, testdata=None):
         if testdata is None:
             testdata = {}
-        self.exception = None
+        # local, same scenario or step definition can be executing on other thread
+        exception = None
         steps = self.steps.copy()
         for bdd_step in steps:
             try:
-                execute_step(bdd_step, testdata, self.is_dryrun_mode, self.exception is not None)
+                execute_step(bdd_step, testdata, self.is_dryrun_mode, exception is not None)
             except BaseException or Exception as e:
-                self.exception = e
-        if self.exception:
-            raise self.exception
+                exception = e
+        if exception:
+            raise exception
         if isinstance(self, Bdd2Background): return steps
 
 
@@ -117,7 +157,8 @@ class Bdd2Scenario(Bdd2StepCollection, SupportsBdd2Metadata):
     @property
     def has_dataprovider(self):
         if self.examples:
-            self.metadata.update({"JSON_DATA_TABLE": self.examples.data_table})
+            # rows are created from table when scenario gets executed with it
+            self.metadata.update({"JSON_DATA_TABLE": self.examples.table})
             self.examples = None
         return "datafile" in self.metadata or "JSON_DATA_TABLE" in self.metadata
 
@@ -135,9 +176,16 @@ class Bdd2StepDefinition(Bdd2StepCollection, SupportsBdd2Metadata):
     def __call__(self, *args, **kwargs):
         return self.execute(testdata=kwargs.get("kwargs",kwargs))
 
+    def __getstate__(self):
+        # wrapper is created again when step definition is registered after unpickling
+        state = self.__dict__.copy()
+        state.pop("wrapper", None)
+        return state
+
 
 @dataclass
 class Bdd2Feature(Bdd2Node, SupportsBdd2Metadata):
     path: str=""
     backgrounds: list[Bdd2Background] = field(default_factory=list)
     scenarios: list[Bdd2Scenario] = field(default_factory=list)
+    step_definitions: list[Bdd2StepDefinition] = field(default_factory=list)
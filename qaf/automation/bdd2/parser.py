@@ -1,12 +1,13 @@
-import re
 from copy import deepcopy
 from dataclasses import field, dataclass
 from typing import TypeVar
 
 from qaf.automation.bdd2.bdd_keywords import *
-from qaf.automation.bdd2.bdd_keywords import TAG, SCENARIO_OUTLINE
+from qaf.automation.bdd2.bdd_keywords import TAG
+from qaf.automation.bdd2.lexer import Token, tokenize
 from qaf.automation.bdd2.model import SupportsBdd2DataTable, Bdd2Scenario, Bdd2Background, Bdd2Examples, \
-    Bdd2MultiLineComment, Bdd2Feature, Bdd2Step, Bdd2StepDefinition, Bdd2StepCollection
+    Bdd2MultiLineComment, Bdd2Feature, Bdd2Step, Bdd2StepDefinition, Bdd2StepCollection, LayeredMetadata, \
+    shared_metadata
 from qaf.automation.bdd2.qaf_teststep import QAFTestStep
 from qaf.automation.core import get_bundle
 from qaf.automation.core.qaf_exceptions import ParseError
@@ -18,7 +19,7 @@ BDD2StatementCollector = TypeVar("BDD2StatementCollector", bound="BDD2StatementC
 class BDD2StatementCollector:
     parent: BDD2StatementCollector
 
-    def collect(self, stmt: str, line_no: int, _type: str) -> BDD2StatementCollector:
+    def collect(self, token: Token) -> BDD2StatementCollector:
         pass
 
 
@@ -33,10 +34,10 @@ class BDD2MetadataCollector(BDD2StatementCollector):
             return False
         return True
 
-    def collect(self, stmt: str, line_no: int, _type: str) -> BDD2StatementCollector:
-        if TAG != _type:
-            return self.parent.collect(stmt, line_no, _type)
-        for tag in stmt.split("@"):
+    def collect(self, token: Token) -> BDD2StatementCollector:
+        if TAG != token.type:
+            return self.parent.collect(token)
+        for tag in token.stmt.split("@"):
             tag = tag.strip()
             if ":" in tag:
                 k, v = tag.split(":", 1)
@@ -53,58 +54,59 @@ class BDD2MetadataCollector(BDD2StatementCollector):
 class BDD2DataTableCollector(BDD2StatementCollector):
     node: SupportsBdd2DataTable
 
-    def collect(self, stmt: str, line_no: int, _type: str) -> BDD2StatementCollector:
-        if stmt[0] == "|":
-            self.node.add_data_row(stmt)
+    def collect(self, token: Token) -> BDD2StatementCollector:
+        if token.stmt[0] == "|":
+            self.node.add_data_row(token.stmt)
             return self
-        if _type == MULTI_LINE_COMMENT:
-            comment = Bdd2MultiLineComment(parent=self.node, name=stmt, lineNo=line_no)
+        if token.type == MULTI_LINE_COMMENT:
+            comment = Bdd2MultiLineComment(parent=self.node, name=token.stmt, lineNo=token.line_no)
             return BDD2MultilineCommentCollector(comment, parent=self)
         try:
-            return self.parent.collect(stmt, line_no, _type)
+            return self.parent.collect(token)
         except:
-            raise ParseError(f"Not supported statement in datatable @{line_no}")
+            raise ParseError(f"Not supported statement in datatable @{token.line_no}")
 
 
 @dataclass
 class BDD2MultilineCommentCollector(BDD2StatementCollector):
     comment = Bdd2MultiLineComment
 
-    def collect(self, stmt: str, line_no: int, _type: str) -> BDD2StatementCollector:
-        self.comment.name = f'{self.comment.name}\n{stmt}'
-        return self.parent if _type == MULTI_LINE_COMMENT_END or _type == MULTI_LINE_COMMENT else self
+    def collect(self, token: Token) -> BDD2StatementCollector:
+        self.comment.name = f'{self.comment.name}\n{token.stmt}'
+        return self.parent if token.type == MULTI_LINE_COMMENT_END or token.type == MULTI_LINE_COMMENT else self
 
 
 @dataclass
 class BDD2ScenarioCollector(BDD2StatementCollector):
     scenario: Bdd2StepCollection
 
-    def collect(self, stmt: str, line_no: int, _type: str) -> BDD2StatementCollector:
-        if not _type and _is_step(stmt): #set parent at the time of execution to clone to avoid deepcopy cycling
-            self.scenario.steps.append(Bdd2Step(name=stmt, lineNo=line_no, parent=None))
+    def collect(self, token: Token) -> BDD2StatementCollector:
+        if token.is_step: #set parent at the time of execution to clone to avoid deepcopy cycling
+            self.scenario.steps.append(Bdd2Step.from_token(token, parent=None))
             return self
-        if EXAMPLES.lower() == _type.lower():
+        if EXAMPLES.lower() == token.type.lower():
             if type(self.scenario) == Bdd2Background or type(self.scenario) == Bdd2StepDefinition:
                 raise ParseError("Examples not allowed with background or step definition.")
-            self.scenario.examples = Bdd2Examples(lineNo=line_no, parent=self.scenario)
+            self.scenario.examples = Bdd2Examples(lineNo=token.line_no, parent=self.scenario)
             return BDD2DataTableCollector(node=self.scenario.examples,
                                           parent=self.parent)  # after examples return to feature collector
-        if stmt[0] == "|":
+        if token.stmt[0] == "|":
             step = self.scenario.steps[-1]
-            return BDD2DataTableCollector(node=step, parent=self).collect(stmt, line_no, _type)
-        if _type == MULTI_LINE_COMMENT:
-            comment = Bdd2MultiLineComment(parent=self.scenario, name=stmt, lineNo=line_no)
+            return BDD2DataTableCollector(node=step, parent=self).collect(token)
+        if token.type == MULTI_LINE_COMMENT:
+            comment = Bdd2MultiLineComment(parent=self.scenario, name=token.stmt, lineNo=token.line_no)
             return BDD2MultilineCommentCollector(comment, parent=self)
         try:
-            return self.parent.collect(stmt, line_no, _type)
+            return self.parent.collect(token)
         except:
-            raise ParseError(f"Not supported statement for {type(self.scenario)} @{line_no}")
+            raise ParseError(f"Not supported statement for {type(self.scenario)} @{token.line_no}")
 
 
 @dataclass
 class FeatureCollector(BDD2StatementCollector):
     feature: Bdd2Feature
     _metadata_collector: BDD2MetadataCollector = None
+    uses_env: bool = False
 
     @property
     def metadata_collector(self):
@@ -112,89 +114,83 @@ class FeatureCollector(BDD2StatementCollector):
             self._metadata_collector = BDD2MetadataCollector(parent=self)
         return self._metadata_collector
 
-    def collect(self, stmt: str, line_no: int, _type: str) -> BDD2StatementCollector:
+    def _layered_metadata(self) -> LayeredMetadata:
+        # feature metadata is shared, not copied, by all nodes of feature
+        return LayeredMetadata(dict(self.metadata_collector.metadata), self.feature.metadata)
+
+    def collect(self, token: Token) -> BDD2StatementCollector:
+        _type = token.type
         if TAG == _type:
-            return self.metadata_collector.collect(stmt, line_no, _type)
+            return self.metadata_collector.collect(token)
         if _type.lower() == FEATURE.lower():
             if self.feature.name != "":
                 raise ParseError("Feature file can have at most one Feature.")
-            self.feature.metadata = deepcopy(self.metadata_collector.metadata)
+            self.feature.metadata = shared_metadata(self.metadata_collector.metadata)
             self.metadata_collector.metadata.clear()
-            self.feature.name = stmt.split(":", 1)[1].strip()
-            self.feature.lineNo = line_no
+            self.feature.name = token.text
+            self.feature.lineNo = token.line_no
             return self
         if SCENARIO.lower() in _type.lower():
             if "groups" in self.metadata_collector.metadata and "step" in self.metadata_collector.metadata["groups"]:
                 _type = STEP_DEF
             else:
-                scenario = Bdd2Scenario(parent=self.feature, name=stmt.split(":", 1)[1].strip(),
-                                        lineNo=line_no,
-                                        metadata=deepcopy(self.feature.metadata) | deepcopy(
-                                            self.metadata_collector.metadata))
+                scenario = Bdd2Scenario(parent=self.feature, name=token.text,
+                                        lineNo=token.line_no,
+                                        metadata=self._layered_metadata())
                 self.metadata_collector.metadata.clear()
                 self.feature.scenarios.append(scenario)
                 return BDD2ScenarioCollector(parent=self, scenario=scenario)
         if STEP_DEF.lower() == _type.lower():
-            step_def = Bdd2StepDefinition(parent=self.feature, name=stmt.split(":", 1)[1].strip(),
-                                          lineNo=line_no,
-                                          metadata=deepcopy(self.feature.metadata) | deepcopy(
-                                              self.metadata_collector.metadata))
+            step_def = Bdd2StepDefinition(parent=self.feature, name=token.text,
+                                          lineNo=token.line_no,
+                                          metadata=self._layered_metadata())
             self.metadata_collector.metadata.clear()
-            # self.feature.scenarios.append(scenario)
+            self.feature.step_definitions.append(step_def)
             QAFTestStep(step_def.name)(step_def)
             return BDD2ScenarioCollector(parent=self, scenario=step_def)
         if BACKGROUND.lower() == _type.lower():
-            background = Bdd2Background(parent=self.feature, name=stmt.split(":", 1)[1].strip(),
-                                        lineNo=line_no)
+            background = Bdd2Background(parent=self.feature, name=token.text,
+                                        lineNo=token.line_no)
             if "global" != self.metadata_collector.metadata.get("scope", "").lower():
                 background.metadata = deepcopy(self.metadata_collector.metadata)
             else:
-                background.metadata = deepcopy(self.feature.metadata) | deepcopy(
-                    self.metadata_collector.metadata)
+                background.metadata = self._layered_metadata()
             self.metadata_collector.metadata.clear()
             self.feature.backgrounds.append(background)
             return BDD2ScenarioCollector(self, background)
         if EXAMPLES.lower() == _type.lower():
             scenario = self.feature.scenarios[-1]
-            examples = Bdd2Examples(parent=scenario, lineNo=line_no)
+            examples = Bdd2Examples(parent=scenario, lineNo=token.line_no)
             if len(self.metadata_collector.metadata) == 0 and scenario.examples is not None:
-                raise ParseError(f"Unexpected Examples @{line_no}")
-            elif scenario.examples is not None and self.metadata_collector.matches(target=get_bundle()):
-                # env specific matched
-                scenario.examples = examples
+                raise ParseError(f"Unexpected Examples @{token.line_no}")
+            elif scenario.examples is not None:
+                # env specific examples, parsed result depends on configuration
+                self.uses_env = True
+                if self.metadata_collector.matches(target=get_bundle()):
+                    scenario.examples = examples
             self.metadata_collector.metadata.clear()
             return BDD2DataTableCollector(node=examples, parent=self)
         if _type == MULTI_LINE_COMMENT:
-            comment = Bdd2MultiLineComment(parent=self.feature, name=stmt, lineNo=line_no)
-            return BDD2MultilineCommentCollector(comment, parent=self).collect(stmt, line_no, _type)
-        return ParseError(f"Unsupported statement @{line_no}")
+            comment = Bdd2MultiLineComment(parent=self.feature, name=token.stmt, lineNo=token.line_no)
+            return BDD2MultilineCommentCollector(comment, parent=self).collect(token)
+        return ParseError(f"Unsupported statement @{token.line_no}")
 
 
 def parse(path):
+    return parse_feature(path)[0]
+
+
+def parse_feature(path):
+    """
+    Returns parsed feature and whether parsed result depends on current environment configuration.
+    """
     feature = Bdd2Feature(path=path)
     with open(path) as fp:
-        collector = FeatureCollector(None, feature=feature)
-        for line_number, line in enumerate(fp):
+        feature_collector = collector = FeatureCollector(None, feature=feature)
+        for token in tokenize(fp):
             try:
-                stmt = line.strip()
-                if stmt == "" or stmt[0] in COMMENT_CHARS: continue
-                _type: str = _getType(stmt)
-                collector = collector.collect(stmt, line_number, _type)
+                collector = collector.collect(token)
             except ParseError as e:
-                raise ParseError(f'bdd parsing error: {str(e)} in {path}@{line_number}')
-    return feature
-
-
-def _getType(line):
-    if line.endswith(MULTI_LINE_COMMENT) and len(set(line)) > 1:  # contains other than comment char
-        return MULTI_LINE_COMMENT_END
-    match = re.match(
-        "|".join([TAG, SCENARIO_OUTLINE, SCENARIO, STEP_DEF, EXAMPLES, FEATURE, BACKGROUND, MULTI_LINE_COMMENT])
-        , line,
-        re.I)
-    return match.group() if match else ""
-
+                raise ParseError(f'bdd parsing error: {str(e)} in {path}@{token.line_no}')
+    return feature, feature_collector.uses_env
 
-def _is_step(line):
-    match = re.match("|".join(STEP_TYPES), line, re.I)
-    return True if match else False
@@ -40,7 +40,8 @@ class QAFTestStep:
             self.name = self.description  # inline step
         self.keyword = keyword
         self.metadata = {**kwargs}
-
+        self._call_plan = None
+        self._name_pattern = None
 
     def __enter__(self):  # inline step with Given/When/Then/Step/And(step description):
         # plugin_manager.hook.start_step(uuid=self.uuid, name=self.name, description=self.description)
@@ -92,6 +93,10 @@ class QAFTestStep:
         from qaf.automation.bdd2.step_registry import step_registry
         self.func = func
         self.func.wrapper = self
+        try:
+            self._call_plan = _CallPlan(func)
+        except TypeError:
+            pass  # not introspectable, let invocation report it
         self.name = func.name if hasattr(func,"name") else func.__name__
         self.description = self.description or self.name
         step_registry.register_step(self)
@@ -122,16 +127,24 @@ class QAFTestStep:
         name = self.description or self.name
         try:
             if kwargs:
-                return self.keyword + ' ' + replace_groups(self.matcher.regex_pattern, name, kwargs)
+                return self.keyword + ' ' + replace_groups(self._get_name_pattern(), name, kwargs)
         except BaseException as e:
             pass
         return self.keyword + ' ' + name
 
+    def _get_name_pattern(self):
+        # compiled once per matcher, matcher gets replaced when step registered again
+        if self._name_pattern is None or self._name_pattern[0] is not self.matcher:
+            self._name_pattern = (self.matcher, re.compile(self.matcher.regex_pattern))
+        return self._name_pattern[1]
+
     def _prepare_args(self, step_tracker: StepTracker):
         step_tracker.actual_args = list(step_tracker.args)
         step_tracker.actual_kwargs = step_tracker.kwargs.copy()
 
-        step_tracker.kwargs = _getcallargs(self.func, *step_tracker.args, **step_tracker.kwargs)
+        if self._call_plan is None or self._call_plan.func is not self.func:
+            self._call_plan = _CallPlan(self.func)
+        step_tracker.kwargs = self._call_plan.bind(step_tracker.args, step_tracker.kwargs)
         step_tracker.args = []
         # step_tracker.kwargs.update({argSpec.args[i]: step_tracker.args.pop(0) for i in range(len(step_tracker.args))})
 
@@ -152,70 +165,98 @@ def _getcallargs(func, /, *positional, **named):
     A dict is returned, with keys the function argument names (including the
     names of the * and ** arguments, if any), and values the respective bound
     values from 'positional' and 'named'."""
-    spec = getfullargspec(func)
-    args, varargs, varkw, defaults, kwonlyargs, kwonlydefaults, ann = spec
-    f_name = func.name if hasattr(func,"name") else func.__name__
-    arg2value = {}
+    return _CallPlan(func).bind(positional, named)
 
-    if args and args[0] == "self" and not positional:
-        # if not positional or not  hasattr(positional[0],f_name):
-        from qaf.automation.bdd2.model import Bdd2StepDefinition
-        if type(func) == Bdd2StepDefinition:
-            # no need to pass self
-            args.pop(0)
-        else:
-            instance = _get_missing_arg("self", func)
-            # implicit 'self' (or 'cls' for classmethods) argument
-            positional = (instance,) + positional
-    num_pos = len(positional)
-    num_args = len(args)
-    if CONTEXT in args and num_pos + len(named) < num_args:
-        pos = args.index(CONTEXT)
-        val = _get_missing_arg(CONTEXT, func)
-        positional = positional[:pos] + (val,) + positional[pos:]
-        num_pos = len(positional)
 
-    num_defaults = len(defaults) if defaults else 0
-
-    n = min(num_pos, num_args)
-    for i in range(n):
-        arg2value[args[i]] = positional[i]
-    if varargs:
-        arg2value[varargs] = tuple(positional[n:])
-    possible_kwargs = set(args + kwonlyargs)
-    if varkw:
-        arg2value[varkw] = {}
-    for kw, value in named.items():
-        if kw not in possible_kwargs:
-            if not varkw:
-                raise TypeError("%s() got an unexpected keyword argument %r" %
-                                (f_name, kw))
-            arg2value[varkw][kw] = value
-            continue
-        if kw in arg2value:
-            raise TypeError("%s() got multiple values for argument %r" %
-                            (f_name, kw))
-        arg2value[kw] = value
-    # if num_pos > num_args and not varargs:
-    # do nothing let actual call fail with to many argument error
-    if num_pos < num_args:
-        req = args[:num_args - num_defaults]
-        for arg in req:
-            if arg not in arg2value:
-                arg2value[arg] = _get_missing_arg(arg, func)
-        for i, arg in enumerate(args[num_args - num_defaults:]):
-            if arg not in arg2value:
-                arg2value[arg] = _get_missing_arg(arg, func) \
-                    if defaults[i] == FIXTURE \
-                    else defaults[i]
-    for kwarg in kwonlyargs:
-        if kwarg not in arg2value:
-            if kwonlydefaults and kwarg in kwonlydefaults:
-                arg2value[kwarg] = kwonlydefaults[kwarg]
-            else:
-                arg2value[kwarg] = _get_missing_arg(kwarg, func)
+class _CallPlan:
+    """
+    Argument binding plan of a step function.
+    Built once from the function signature and used to map arguments on each invocation of the step.
+    """
 
-    return arg2value
+    def __init__(self, func):
+        from qaf.automation.bdd2.model import Bdd2StepDefinition
+        args, varargs, varkw, defaults, kwonlyargs, kwonlydefaults, ann = getfullargspec(func)
+        self.func = func
+        self.f_name = func.name if hasattr(func, "name") else func.__name__
+        self.varargs = varargs
+        self.varkw = varkw
+        self.kwonlyargs = kwonlyargs
+        self.kwonlydefaults = kwonlydefaults or {}
+        self.defaults = defaults or ()
+        self.implicit_self = bool(args) and args[0] == "self"
+        self.is_step_def = type(func) == Bdd2StepDefinition
+        # args slots when self is passed/injected and when self is not needed for step definition
+        self.slots = _ArgSlots(args, self.defaults, kwonlyargs)
+        self.slots_without_self = _ArgSlots(args[1:], self.defaults, kwonlyargs) if self.implicit_self else self.slots
+
+    def bind(self, positional, named) -> dict:
+        slots = self.slots
+        if self.implicit_self and not positional:
+            if self.is_step_def:
+                # no need to pass self
+                slots = self.slots_without_self
+            else:
+                # implicit 'self' (or 'cls' for classmethods) argument
+                positional = (_get_missing_arg("self", self.func),) + tuple(positional)
+        func = self.func
+        args = slots.args
+        num_pos = len(positional)
+        num_args = slots.num_args
+        if slots.context_pos >= 0 and num_pos + len(named) < num_args:
+            pos = slots.context_pos
+            positional = tuple(positional[:pos]) + (_get_missing_arg(CONTEXT, func),) + tuple(positional[pos:])
+            num_pos = len(positional)
+
+        arg2value = {}
+        n = min(num_pos, num_args)
+        for i in range(n):
+            arg2value[args[i]] = positional[i]
+        if self.varargs:
+            arg2value[self.varargs] = tuple(positional[n:])
+        varkw = self.varkw
+        if varkw:
+            arg2value[varkw] = {}
+        for kw, value in named.items():
+            if kw not in slots.possible_kwargs:
+                if not varkw:
+                    raise TypeError("%s() got an unexpected keyword argument %r" %
+                                    (self.f_name, kw))
+                arg2value[varkw][kw] = value
+                continue
+            if kw in arg2value:
+                raise TypeError("%s() got multiple values for argument %r" %
+                                (self.f_name, kw))
+            arg2value[kw] = value
+        # if num_pos > num_args and not varargs:
+        # do nothing let actual call fail with to many argument error
+        if num_pos < num_args:
+            for arg in slots.required:
+                if arg not in arg2value:
+                    arg2value[arg] = _get_missing_arg(arg, func)
+            for arg, default, is_fixture in slots.optional:
+                if arg not in arg2value:
+                    arg2value[arg] = _get_missing_arg(arg, func) if is_fixture else default
+        for kwarg in self.kwonlyargs:
+            if kwarg not in arg2value:
+                if kwarg in self.kwonlydefaults:
+                    arg2value[kwarg] = self.kwonlydefaults[kwarg]
+                else:
+                    arg2value[kwarg] = _get_missing_arg(kwarg, func)
+
+        return arg2value
+
+
+class _ArgSlots:
+    def __init__(self, args, defaults, kwonlyargs):
+        self.args = tuple(args)
+        self.num_args = len(args)
+        self.context_pos = args.index(CONTEXT) if CONTEXT in args else -1
+        self.possible_kwargs = frozenset(args + kwonlyargs)
+        num_defaults = len(defaults)
+        self.required = self.args[:self.num_args - num_defaults]
+        self.optional = tuple((arg, defaults[i], defaults[i] == FIXTURE)
+                              for i, arg in enumerate(self.args[self.num_args - num_defaults:]))
 
 
 def _get_missing_arg(argname, func):
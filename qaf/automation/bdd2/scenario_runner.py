@@ -0,0 +1,261 @@
+#  Copyright (c) 2022 Infostretch Corporation
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#  #
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import pytest
+
+from qaf.automation.bdd2.feature_cache import load_feature
+from qaf.automation.bdd2.model import Bdd2Feature, Bdd2Scenario
+from qaf.automation.core import get_bundle
+from qaf.automation.core.test_base import clear_assertions_log, get_checkpoint_results, get_command_logs, \
+    get_verification_errors, is_verification_failed, set_test_context, tear_down
+from qaf.automation.integration.result_updator import update_result
+from qaf.automation.integration.testcase_run_result import TestCaseRunResult
+from qaf.automation.keys.application_properties import ApplicationProperties
+from qaf.automation.util.csv_util import DataTable, DataRow
+from qaf.automation.util.dataprovider_util import get_testdata
+from qaf.automation.util.string_util import to_boolean
+
+"""
+In-process runner to execute BDD2 scenarios concurrently on a thread pool, for I/O bound scenarios,
+for instance using remote grid or web services, where process per worker wastes memory.
+Each worker thread is a slot with its own execution context, so driver, command log and checkpoints
+are not shared between scenarios running at the same time. Results are reported using `update_result`.
+
+Scenarios of feature with `@parallel:false` run one after other in one slot,
+scenario with `@parallel:false` runs alone after all other scenarios.
+Configuration bundle is shared by all slots, scenarios storing values in bundle should not run in parallel.
+
+usage: python -m qaf.automation.bdd2.scenario_runner [-w workers] [--metadata-filter expr] [--dryrun] paths...
+"""
+
+DEFAULT_WORKERS = 4
+# background scope with once per feature execution, same as module scoped fixture with pytest
+FEATURE_SCOPE = "feature"
+
+
+class ScenarioRun:
+    """
+    Single execution of scenario, with one row of test data for data driven scenario.
+    Used as test context while scenario is running, so steps and `add_metadata` can access it.
+    """
+
+    def __init__(self, feature: Bdd2Feature, scenario: Bdd2Scenario, testdata=None, index: int = None):
+        self.feature = feature
+        self.scenario = scenario
+        self.testdata = testdata
+        self.name = scenario.name
+        if index is not None:
+            row = testdata.get() if isinstance(testdata, DataRow) else testdata
+            self.name = f'{scenario.name}[{row.get("tcId", row.get("summary")) or f"testdata{index}"}]'
+        self.metadata = {key: value for key, value in scenario.metadata.items() if key != "JSON_DATA_TABLE"}
+
+    @property
+    def parallel(self) -> bool:
+        return to_boolean(str(self.scenario.metadata.get("parallel", True)))
+
+    def execute(self, slot: dict) -> str:
+        start = int(time.time() * 1000)
+        clear_assertions_log()
+        set_test_context(self)
+        throwable = None
+        try:
+            _execute_backgrounds(self.feature, slot)
+            testdata = self.testdata.get() if isinstance(self.testdata, DataRow) else self.testdata
+            self.scenario.execute(testdata)
+            status = "passed"
+            if is_verification_failed():
+                status = "failed"
+                throwable = f'AssertionError: {get_verification_errors()} verification failed.'
+        except pytest.skip.Exception as e:
+            status, throwable = "skipped", str(e)
+        except BaseException:
+            status, throwable = "failed", traceback.format_exc()
+        self._report(status, start, throwable)
+        clear_assertions_log()
+        tear_down()
+        return status
+
+    def _report(self, status, start, throwable):
+        result = TestCaseRunResult()
+        result.className = os.path.relpath(self.feature.path)
+        result.status = status
+        result.checkPoints = list(get_checkpoint_results())
+        result.commandLogs = get_command_logs().copy()
+        result.starttime = start
+        result.endtime = int(time.time() * 1000)
+        result.metaData = {"name": self.name, "resultFileName": self.name,
+                           "reference": f'{result.className}::{self.name}',
+                           "description": self.scenario.name} | self.metadata
+        if self.testdata is not None:
+            testdata = self.testdata.get() if isinstance(self.testdata, DataRow) else self.testdata
+            result.testData = [{"testdata": testdata}]
+        result.throwable = throwable
+        result.executionInfo = {
+            "testName": "BDD2",
+            "suiteName": os.path.basename(os.getcwd()),
+            "driverCapabilities": {
+                "browser-desired-capabilities": get_bundle().get("driver.desiredCapabilities", {}),
+                "browser-actual-capabilities": get_bundle().get("driverCapabilities", {})
+            }
+        }
+        update_result(result)
+
+
+def collect(paths, meta_filter: str = "", dryrun: bool = False) -> list:
+    """
+    Returns list of (feature, scenario runs) for feature files under given paths.
+    """
+    from qaf.automation.bdd2.factory import should_include
+
+    features = []
+    for path in _feature_paths(paths):
+        feature = load_feature(str(path))
+        runs = []
+        for background in feature.backgrounds:
+            background.is_dryrun_mode = dryrun
+        for scenario in feature.scenarios:
+            if not should_include(meta_filter, scenario):
+                continue
+            scenario.is_dryrun_mode = dryrun
+            if scenario.has_dataprovider:
+                testdata = _get_testdata(scenario)
+                if isinstance(testdata, DataTable):
+                    rows = [DataRow(testdata, index) for index in range(len(testdata))]
+                else:
+                    rows = list(testdata)
+                runs.extend(ScenarioRun(feature, scenario, row, index) for index, row in enumerate(rows))
+            else:
+                runs.append(ScenarioRun(feature, scenario))
+        if runs:
+            features.append((feature, runs))
+    return features
+
+
+def run(paths, workers: int = 0, meta_filter: str = "", dryrun: bool = False) -> dict:
+    """
+    Executes scenarios from feature files under given paths and returns count of scenario runs by status.
+    """
+    workers = workers or get_bundle().get_int(ApplicationProperties.SCENARIO_PARALLEL_WORKERS, DEFAULT_WORKERS)
+    features = collect(paths, meta_filter, dryrun)
+
+    tasks, serial_runs = [], []
+    for feature, runs in features:
+        if not to_boolean(str(feature.metadata.get("parallel", True))):
+            tasks.append(runs)
+            continue
+        for scenario_run in runs:
+            if scenario_run.parallel:
+                tasks.append([scenario_run])
+            else:
+                serial_runs.append(scenario_run)
+
+    counts = {}
+    lock = threading.Lock()
+    slots = threading.local()
+
+    def execute(scenario_runs):
+        if not hasattr(slots, "backgrounds"):
+            slots.backgrounds = {}
+        for scenario_run in scenario_runs:
+            status = scenario_run.execute(slots.backgrounds)
+            with lock:
+                counts[status] = counts.get(status, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qaf-scenario") as executor:
+        # errors are reported as scenario result, future fails only on unexpected error in runner
+        for future in wait([executor.submit(execute, task) for task in tasks]).done:
+            future.result()
+    execute(serial_runs)
+    return counts
+
+
+def _execute_backgrounds(feature: Bdd2Feature, slot: dict):
+    for background in feature.backgrounds:
+        if background.metadata.get("scope", "scenario").lower() != FEATURE_SCOPE:
+            _execute_background(background)
+            continue
+        # once per feature in a slot, failure skips remaining scenarios of the feature in the slot
+        key = (id(feature), id(background))
+        if key not in slot:
+            try:
+                _execute_background(background)
+                slot[key] = None
+            except BaseException as e:
+                slot[key] = e
+                raise
+        elif slot[key] is not None:
+            pytest.skip(f'Precondition "{background.name}" failed!')
+
+
+def _execute_background(background):
+    try:
+        background.execute()
+    except pytest.skip.Exception:
+        raise
+    except BaseException:
+        pytest.skip(f'Precondition "{background.name}" failed!')
+
+
+def _get_testdata(scenario: Bdd2Scenario):
+    meta_data = dict(scenario.metadata)
+    if "JSON_DATA_TABLE" in meta_data:
+        return meta_data["JSON_DATA_TABLE"]
+    global_testdata = get_bundle().get_raw_value("global.testdata")
+    dataprovider = json.loads(global_testdata) if global_testdata else None
+    meta_data = meta_data | {"method": scenario.name, "class": ""}
+    return get_testdata(dataprovider or meta_data, meta_data)
+
+
+def _feature_paths(paths):
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(path.rglob("*.feature"))
+        elif path.suffix == ".feature":
+            yield path
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m qaf.automation.bdd2.scenario_runner",
+                                     description="Execute BDD2 scenarios concurrently in this process.")
+    parser.add_argument("paths", nargs="+", help="feature files or directories")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help=f"number of scenarios running at the same time, "
+                             f"default `{ApplicationProperties.SCENARIO_PARALLEL_WORKERS}` or {DEFAULT_WORKERS}")
+    parser.add_argument("--metadata-filter", default="", help="qaf metadata filter")
+    parser.add_argument("--dryrun", action="store_true", help="dry run bdd scenarios")
+    options = parser.parse_args(args)
+
+    counts = run(options.paths, options.workers, options.metadata_filter, options.dryrun)
+    print(", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "no scenarios")
+    return 1 if counts.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
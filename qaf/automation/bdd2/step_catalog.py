@@ -0,0 +1,143 @@
+import os
+
+from behave import matchers
+from behave.matchers import Match
+
+from qaf.automation.util.cache_util import get_cache_dir, file_signature, check_signature, load_json, write_json
+
+"""
+On-disk catalog of step definitions provided by step modules. Used to register steps without loading step modules.
+Step module gets loaded when any of its step matches for the first time.
+"""
+
+CATALOG_FILE = "step-catalog.json"
+_MATCHER_NAMES = {matcher_class: name for name, matcher_class in matchers.matcher_mapping.items()}
+
+
+def location_key(filename, line) -> tuple:
+    return os.path.normcase(os.path.abspath(filename)), line
+
+
+class LazyStep:
+    """
+    Stands for a step definition from step module not loaded yet.
+    """
+
+    def __init__(self, record: dict, loader: callable, location: tuple = None):
+        self.description = record["pattern"]
+        self.name = record["name"]
+        self.keyword = record["keyword"]
+        self.metadata = record["metadata"]
+        self.func = None
+        self.matcher = matchers.matcher_mapping[record["matcher"]](None, self.description)
+        self.location = location or location_key(record["file"], record["line"])
+        self._loader = loader
+
+    def load(self):
+        """
+        Loads step module, which replaces this stand-in with actual step definition in the registry.
+        """
+        self._loader()
+
+
+class StepCatalog:
+    """
+    Records steps registered by each step module together with signature (mtime, size and hash)
+    of the module and source files of its steps. Entry is used only when none of the files changed.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(get_cache_dir(), CATALOG_FILE)
+        self.entries = load_json(self.path, {})
+        self.dirty = False
+
+    def get(self, step_file: str):
+        """
+        Returns step records of the step module or None when not available or outdated.
+        """
+        entry = self.entries.get(_file_key(step_file))
+        if not entry:
+            return None
+        for source, signature in entry["sources"].items():
+            current = check_signature(source, signature)
+            if current is None:
+                return None
+            if current is not signature:
+                # touched but same content
+                entry["sources"][source] = current
+                self.dirty = True
+        return entry["steps"]
+
+    def put(self, step_file: str, steps: list) -> None:
+        """
+        Records steps registered by loading the step module.
+        """
+        key = _file_key(step_file)
+        records = [_to_record(step) for step in steps]
+        self.dirty = True
+        if None in records:
+            self.entries.pop(key, None)  # can't be restored, always load the module
+            return
+        sources = {key} | {record["file"] for record in records}
+        self.entries[key] = {"sources": {source: file_signature(source) for source in sources},
+                             "steps": records}
+
+    def remove(self, step_file: str) -> None:
+        if self.entries.pop(_file_key(step_file), None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        if self.dirty:
+            write_json(self.path, self.entries)
+            self.dirty = False
+
+
+def load_manifest(manifest_file: str) -> list:
+    """
+    Returns step records from step manifest, in registration order.
+    """
+    manifest = load_json(manifest_file)
+    if manifest is None:
+        raise FileNotFoundError(f"Unable to read step manifest {manifest_file}")
+    return manifest["steps"]
+
+
+def to_manifest_record(step, module: str) -> dict:
+    """
+    Returns step record for step manifest, step will be registered by importing given module.
+    """
+    record = _to_record(step)
+    if record is None:
+        raise ValueError(f"Step '{step.description}' can not be listed in manifest, "
+                         f"it uses custom matcher or metadata not supported by json")
+    record.pop("file")
+    record["module"] = module
+    return record
+
+
+def _file_key(step_file: str) -> str:
+    return os.path.normcase(os.path.abspath(step_file))
+
+
+def _to_record(step):
+    matcher_name = _MATCHER_NAMES.get(type(step.matcher))
+    if matcher_name is None or not _is_json_value(step.metadata):
+        return None
+    location = Match.make_location(step.func)
+    return {
+        "pattern": step.matcher.pattern,
+        "matcher": matcher_name,
+        "name": step.name,
+        "keyword": step.keyword,
+        "metadata": step.metadata,
+        "file": location_key(location.filename, location.line)[0],
+        "line": location.line,
+    }
+
+
+def _is_json_value(value) -> bool:
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _is_json_value(v) for k, v in value.items())
+    if isinstance(value, list):
+        return all(_is_json_value(v) for v in value)
+    return value is None or isinstance(value, (str, int, float, bool))
@@ -0,0 +1,71 @@
+#  Copyright (c) 2022 Infostretch Corporation
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#  #
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import argparse
+import os
+
+"""
+Generates step manifest to be used with `step.manifest.file` property.
+With manifest, steps are registered without importing step modules and
+module providing a step is imported only when that step is used.
+
+usage: python -m qaf.automation.bdd2.step_manifest [-o step-manifest.json]
+
+Regenerate manifest whenever step definitions are added, removed or moved.
+"""
+
+
+def generate(manifest_file: str) -> int:
+    """
+    Writes manifest of all steps from built-in steps and `step.provider.pkg` packages.
+    Returns number of steps listed.
+    """
+    from qaf.automation.bdd2.step_catalog import LazyStep, to_manifest_record
+    from qaf.automation.bdd2.step_registry import step_registry, step_module_name
+    from qaf.automation.util.cache_util import write_json
+    from behave.matchers import Match
+
+    for step in list(step_registry.registry):
+        if isinstance(step, LazyStep):
+            step.load()  # registered from existing manifest or catalog
+    records = []
+    for step in step_registry.registry:
+        if isinstance(step, LazyStep):
+            raise ValueError(f"Step '{step.description}' no longer provided by module")
+        location = Match.make_location(step.func)
+        module = step_module_name(location.filename)
+        if module is None:
+            raise ValueError(f"Unable to find module for step '{step.description}' from {location.filename}")
+        records.append(to_manifest_record(step, module))
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_file)), exist_ok=True)
+    write_json(manifest_file, {"steps": records})
+    return len(records)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m qaf.automation.bdd2.step_manifest",
+                                     description="Generate step manifest for lazy loading of step modules.")
+    parser.add_argument("-o", "--output", default="step-manifest.json", help="manifest file to write")
+    options = parser.parse_args(args)
+    count = generate(options.output)
+    print(f"{count} steps written to {options.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 from __future__ import absolute_import
 
+import importlib
 import inspect
 import os
+import sys
+from collections import OrderedDict
 from functools import partial
+from heapq import merge
+from threading import Lock, RLock
 
-from behave.matchers import Match, get_matcher, MatchWithError
+from behave.matchers import Match, get_matcher, MatchWithError, ParseMatcher, RegexMatcher
 from behave.model_core import FileLocation
 from behave.textutil import text as _text
 
@@ -14,6 +19,7 @@ __all__ = [
     "Given", "When", "Then", "Step", "And", "But"
 ]
 
+from qaf.automation.bdd2.step_catalog import StepCatalog, LazyStep, location_key
 from qaf.automation.core import get_bundle
 from qaf.automation.keys.application_properties import ApplicationProperties
 
@@ -21,6 +27,12 @@ from qaf.automation.keys.application_properties import ApplicationProperties
 class StepRegistry:
     def __init__(self):
         self.registry = []
+        self._index = StepIndex()
+        self._by_pattern = {}
+        self._locations = set()
+        self._lazy = {}
+        self.recording = None
+        self.match_cache = StepMatchCache(get_bundle().get_int(ApplicationProperties.STEP_MATCH_CACHE_SIZE, 1024))
 
     def discover_package(self, package):
         pass
@@ -43,18 +55,57 @@ class StepRegistry:
             step_text = _text(step.description)
             # set matcher even regardless of existing or new for direct method call or when not using bdd
             step.matcher = get_matcher(step.func, step_text)
-            for existing in self.registry:
+            location = location_key(step_location.filename, step_location.line)
+            module_location = (None, 0) if type(step.func) == Bdd2StepDefinition else \
+                (getattr(step.func, "__module__", None), step_location.line)
+            for key in (location, module_location):
+                if key in self._lazy:
+                    # step module got loaded, replace stand-in keeping registration order
+                    self._add(step, step_text, (location, module_location), self._lazy.pop(key))
+                    return
+            for existing in self._by_pattern.get(step_text, []):
                 if self.same_step_definition(existing.matcher, step_text, step_location):
                     # -- EXACT-STEP: Same step function is already registered.
                     # This may occur when a step module imports another one.
                     return
             # matcher = get_matcher(step, step_text)
+            self._add(step, step_text, (location, module_location))
+
+    def register_lazy_step(self, lazy_step: LazyStep):
+        """
+        Registers stand-in for step definition from step module which is not loaded yet.
+        """
+        if lazy_step.location in self._locations:
+            return
+        self._lazy[lazy_step.location] = len(self.registry)
+        self._locations.add(lazy_step.location)
+        self._index.add(len(self.registry), lazy_step.matcher)
+        self.registry.append(lazy_step)
+        self.match_cache.clear()
+
+    def _add(self, step, step_text, locations, position=None):
+        if position is None:
+            self._index.add(len(self.registry), step.matcher)
             self.registry.append(step)
+        else:
+            self.registry[position] = step
+        self._by_pattern.setdefault(step_text, []).append(step)
+        self._locations.update(locations)
+        if self.recording is not None:
+            self.recording.append(step)
+        # new definition may take over steps resolved earlier
+        self.match_cache.clear()
 
     def lookup(self, step):
         step_name = step if type(step) is str else step.name
-        for step_definition in self.registry:
+        for position in self._index.candidates(step_name):
+            step_definition = self.registry[position]
             match = check_match(step_definition, step_name)
+            if match and isinstance(step_definition, LazyStep):
+                # returns once module is loaded, by this or any other thread
+                step_definition.load()
+                step_definition = self.registry[position]
+                match = None if isinstance(step_definition, LazyStep) else check_match(step_definition, step_name)
             if match:
                 return step_definition, match
         return None, None
@@ -66,6 +117,140 @@ class StepRegistry:
                 other_location.filename != "<string>")
 
 
+class StepIndex:
+    """
+    Word trie over leading literal words of step patterns.
+
+    Each step definition is stored under the node reached by the literal words its pattern starts with.
+    Definitions starting with a parameter, or using a matcher that can not be analysed, sit on the root node
+    and are candidates for every step. Lookup walks the trie with words of the step text and returns
+    positions of candidate definitions in registration order, so first-match-wins is preserved.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def add(self, position: int, matcher) -> None:
+        node = self.root
+        for word in _leading_literal_words(matcher):
+            node = node.children.setdefault(word, _TrieNode())
+        node.positions.append(position)
+
+    def candidates(self, step_text: str):
+        node = self.root
+        found = [node.positions]
+        for word in step_text.split():
+            if not word.isascii():
+                # case-insensitive regex matching of non ascii text may fold to ascii, don't narrow further
+                found.append(node.subtree_positions())
+                break
+            node = node.children.get(word.lower())
+            if node is None:
+                break
+            found.append(node.positions)
+        return merge(*found)
+
+
+class _TrieNode:
+    __slots__ = ("children", "positions")
+
+    def __init__(self):
+        self.children = {}
+        self.positions = []
+
+    def subtree_positions(self):
+        positions = []
+        for child in self.children.values():
+            positions.extend(child.positions)
+            positions.extend(child.subtree_positions())
+        return sorted(positions)
+
+
+_REGEX_META_CHARS = set(".^$*+?{}[]\\|()")
+_REGEX_QUANTIFIERS = set("*+?{")
+
+
+def _leading_literal_words(matcher) -> list:
+    """
+    Returns lower-cased complete words the step pattern starts with, empty list when none can be determined.
+    Only ascii words are returned, any text matching the pattern starts with these words (ignoring case).
+    """
+    if isinstance(matcher, ParseMatcher):
+        pattern = matcher.pattern
+        end = min([i for i in (pattern.find("{"), pattern.find("}")) if i >= 0], default=len(pattern))
+        literal = pattern[:end]
+    elif isinstance(matcher, RegexMatcher):
+        pattern = matcher.regex.pattern
+        if "|" in pattern:
+            return []  # alternation may bypass leading literal
+        pattern = pattern[1:] if pattern.startswith("^") else pattern
+        end = 0
+        while end < len(pattern) and pattern[end] not in _REGEX_META_CHARS:
+            if end + 1 < len(pattern) and pattern[end + 1] in _REGEX_QUANTIFIERS:
+                break
+            end += 1
+        literal = pattern[:end]
+    else:
+        return []
+    words = literal.split()
+    if words and literal == literal.rstrip():
+        if isinstance(matcher, RegexMatcher):
+            # regex needs to match only start of step text, last word can be prefix of longer word
+            if pattern[end:] != "$":
+                words.pop()
+        elif end < len(pattern):
+            words.pop()  # last word continues with non literal part
+    literal_words = []
+    for word in words:
+        if not word.isascii():
+            break
+        literal_words.append(word.lower())
+    return literal_words
+
+
+class StepMatchCache:
+    """
+    Bounded LRU cache from resolved step text to matched step definition and its arguments.
+    Cache size can be set using `step.match.cache.size` property, 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, step_text: str):
+        """
+        Returns cached (step_definition, args_dict) for the step text or None when not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(step_text)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(step_text)
+            return entry
+
+    def put(self, step_text: str, step_definition, args_dict) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[step_text] = (step_definition, args_dict)
+            self._entries.move_to_end(step_text)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "maxsize": self.maxsize, "size": len(self._entries)}
+
+
 def check_match(step_definition, step):
     try:
         result = step_definition.matcher.check_match(step)
@@ -97,29 +282,93 @@ step_registry = StepRegistry()
 
 def load_step_modules(step_paths):
     """Load step modules with step definitions from step_paths directories."""
-    from behave import matchers
-    from behave.runner_util import PathManager, exec_file
-
-    step_globals = {
-        "use_step_matcher": matchers.use_step_matcher,
-    }
-    setup_step_decorators(step_globals)
+    from behave.runner_util import PathManager
 
+    catalog = _get_step_catalog()
     # -- Allow steps to import other stuff from the steps dir
     # NOTE: Default matcher can be overridden in "environment.py" hook.
     with PathManager(step_paths):
-        default_matcher = matchers.current_matcher
         for path in step_paths:
             for name in sorted(os.listdir(path)):
                 if name.endswith(".py"):
-                    # -- LOAD STEP DEFINITION:
-                    # Reset to default matcher after each step-definition.
-                    # A step-definition may change the matcher 0..N times.
-                    # ENSURE: Each step definition has clean globals.
-                    # try:
-                    step_module_globals = step_globals.copy()
-                    exec_file(os.path.join(path, name), step_module_globals)
-                    matchers.current_matcher = default_matcher
+                    step_file = os.path.join(path, name)
+                    if catalog is None:
+                        load_step_file(step_file)
+                    elif not _restore_step_file(catalog, step_file, step_paths):
+                        _record_step_file(catalog, step_file)
+    if catalog is not None:
+        catalog.save()
+
+
+def load_step_file(step_file):
+    """Load step module with step definitions."""
+    from behave import matchers
+    from behave.runner_util import exec_file
+
+    step_globals = {
+        "use_step_matcher": matchers.use_step_matcher,
+    }
+    setup_step_decorators(step_globals)
+
+    # -- LOAD STEP DEFINITION:
+    # Reset to default matcher after each step-definition.
+    # A step-definition may change the matcher 0..N times.
+    # ENSURE: Each step definition has clean globals.
+    default_matcher = matchers.current_matcher
+    exec_file(step_file, step_globals)
+    matchers.current_matcher = default_matcher
+
+
+def _get_step_catalog():
+    if not get_bundle().get_boolean(ApplicationProperties.STEP_CATALOG, False) or \
+            get_bundle().get_string(ApplicationProperties.TESTING_APPROACH, "").lower() == "behave":
+        return None
+    return StepCatalog()
+
+
+def _restore_step_file(catalog, step_file, step_paths) -> bool:
+    records = catalog.get(step_file)
+    if records is None:
+        return False
+    loader = partial(_load_lazy_step_file, os.path.abspath(step_file), [os.path.abspath(p) for p in step_paths])
+    for record in records:
+        step_registry.register_lazy_step(LazyStep(record, loader))
+    return True
+
+
+def _record_step_file(catalog, step_file):
+    side_effects = _side_effects()
+    step_registry.recording = []
+    try:
+        load_step_file(step_file)
+    finally:
+        steps, step_registry.recording = step_registry.recording, None
+    if side_effects == _side_effects():
+        catalog.put(step_file, steps)
+    else:
+        # module registers types or expressions used elsewhere, it needs to be loaded always
+        catalog.remove(step_file)
+
+
+def _side_effects():
+    from behave.matchers import ParseMatcher
+    return len(ParseMatcher.custom_types), len(get_bundle().evaluator.functions)
+
+
+_lazy_loaded_files = set()
+# held while a step module gets loaded on demand, other threads matching its step wait till it is registered
+_lazy_load_lock = RLock()
+
+
+def _load_lazy_step_file(step_file, step_paths):
+    from behave.runner_util import PathManager
+
+    with _lazy_load_lock:
+        if step_file in _lazy_loaded_files:
+            return
+        _lazy_loaded_files.add(step_file)
+        with PathManager(step_paths):
+            load_step_file(step_file)
 
 
 # -- Create the decorators
@@ -136,20 +385,72 @@ def setup_step_decorators(run_context=None):
 
 def register_steps():
     from qaf.automation.core import get_bundle
-    import qaf.automation.step_def as step_def_path
+    import qaf.automation.step_def as step_def_pkg
     from qaf.automation.keys.application_properties import ApplicationProperties as AP
 
-    step_def_path = str(os.path.dirname(step_def_path.__file__))
+    step_def_path = str(os.path.dirname(step_def_pkg.__file__))
         #str(os.path.abspath(step_def_path.__file__)).replace(os.sep+'__init__.py', '')
 
     QAF_STEPS = [step_def_path]
-    load_step_modules(QAF_STEPS)
+    step_packages[os.path.abspath(step_def_path)] = step_def_pkg.__name__
     step_provider_pkgs = get_bundle().get_string(AP.STEP_PROVIDER_PKG)
+    step_provider_pkg_list = []
     if step_provider_pkgs:
-        step_provider_pkg_list = step_provider_pkgs.replace('.', os.sep).split(";")
+        for step_provider_pkg in step_provider_pkgs.split(";"):
+            step_provider_pkg_list.append(step_provider_pkg.replace('.', os.sep))
+            step_packages[os.path.abspath(step_provider_pkg_list[-1])] = step_provider_pkg
+
+    manifest_file = get_bundle().get_string(AP.STEP_MANIFEST_FILE)
+    if manifest_file and get_bundle().get_string(AP.TESTING_APPROACH, "").lower() != "behave":
+        register_from_manifest(manifest_file, QAF_STEPS + step_provider_pkg_list)
+        return
+    load_step_modules(QAF_STEPS)
+    if step_provider_pkg_list:
         load_step_modules(step_provider_pkg_list)
 
 
+# step directory to package name
+step_packages = {}
+
+
+def step_module_name(file) -> str:
+    """
+    Returns name of the module from file path when module is in step package or already imported, None otherwise.
+    """
+    file = os.path.abspath(file)
+    step_dir, name = os.path.split(file)
+    if step_dir in step_packages and name.endswith(".py"):
+        return f'{step_packages[step_dir]}.{name[:-3]}'
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, "__file__", None)
+        if module_file and os.path.abspath(module_file) == file:
+            return module.__name__
+    return None
+
+
+def register_from_manifest(manifest_file, step_paths):
+    """
+    Registers steps listed in step manifest. Module providing step gets imported when its step matches first time.
+    """
+    from qaf.automation.bdd2.step_catalog import load_manifest
+
+    step_paths = [os.path.abspath(step_path) for step_path in step_paths]
+    for record in load_manifest(manifest_file):
+        loader = partial(_import_step_module, record["module"], step_paths)
+        step_registry.register_lazy_step(LazyStep(record, loader, (record["module"], record["line"])))
+
+
+def _import_step_module(module, step_paths):
+    from behave import matchers
+    from behave.runner_util import PathManager
+
+    with _lazy_load_lock:
+        default_matcher = matchers.current_matcher
+        with PathManager(step_paths + [os.getcwd()]):
+            importlib.import_module(module)
+        matchers.current_matcher = default_matcher
+
+
 # -----------------------------------------------------------------------------
 # MODULE INIT:
 # -----------------------------------------------------------------------------
@@ -25,71 +25,38 @@ class CheckPointBean:
     """
         @author: Chirag Jayswal
     """
-    def __init__(self) -> None:
-        self.message = ''
-        self.type = ''
-        self.duration = 0
-        self.threshold = 0
-        self.screenshot = ''
-        self.subCheckPoints = []
-
-    @property
-    def message(self) -> str:
-        return self.__message
-
-    @message.setter
-    def message(self, value: str) -> None:
-        self.__message = value
-
-    @property
-    def type(self) -> str:
-        return self.__type
-
-    @type.setter
-    def type(self, value: str) -> None:
-        self.__type = value
-
-    @property
-    def duration(self) -> int:
-        return self.__duration
-
-    @duration.setter
-    def duration(self, value: int) -> None:
-        self.__duration = int(value)
-
-    @property
-    def threshold(self) -> int:
-        return self.__threshold
-
-    @threshold.setter
-    def threshold(self, value: int) -> None:
-        self.__threshold = value
-
-    @property
-    def screenshot(self) -> str:
-        return self.__screenshot
-
-    @screenshot.setter
-    def screenshot(self, value: str) -> None:
-        self.__screenshot = value
+    # one per step and log message, slots keep large step trees compact
+    __slots__ = ('message', 'type', 'duration', 'threshold', 'screenshot', '_subCheckPoints')
+
+    def __init__(self, message: str = '', type: str = '', duration: int = 0, threshold: int = 0,
+                 screenshot: str = '', subCheckPoints: list = None) -> None:
+        self.message = message
+        self.type = type
+        self.duration = duration
+        self.threshold = threshold
+        self.screenshot = screenshot
+        # most checkpoints don't have sub checkpoints, list created when required
+        self._subCheckPoints = subCheckPoints
 
     @property
     def subCheckPoints(self) -> list:
-        return self.__subCheckPoints
+        if self._subCheckPoints is None:
+            self._subCheckPoints = []
+        return self._subCheckPoints
 
     @subCheckPoints.setter
     def subCheckPoints(self, value: list):
-        self.__subCheckPoints = value
+        self._subCheckPoints = value
 
     def to_json_dict(self) -> dict:
 
         _dict = {
             "message": self.message,
             "type": self.type,
-            "duration": self.duration,
+            "duration": int(self.duration),
             "threshold": self.threshold,
             "screenshot": self.screenshot,
-            "subCheckPoints": self.subCheckPoints,
+            "subCheckPoints": self._subCheckPoints or [],
         }
         return _dict
 
@@ -98,7 +65,7 @@ class CheckPointBean:
             return True
         if "fail" in self.type.lower():
             return False
-        for checkPoint in self.subCheckPoints:
+        for checkPoint in self._subCheckPoints or ():
             if not checkPoint.is_success():
                 return False
         return True
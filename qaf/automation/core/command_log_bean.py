@@ -25,56 +25,46 @@ class CommandLogBean:
     """
     @author: Chirag Jayswal
     """
-
-    def __init__(self) -> None:
-        self.commandName = ''
-        self.args = []
-        self.result = ''
-        self.__subLogs = []
-        self.duration = 0
-
-    @property
-    def commandName(self) -> str:
-        return self.__commandName
-
-    @commandName.setter
-    def commandName(self, value: str) -> None:
-        self.__commandName = value
+    # one per step and driver command, slots keep large command logs compact
+    __slots__ = ('commandName', '_args', '_result', '_subLogs', 'duration')
+
+    def __init__(self, commandName: str = '', args: list = None, result: str = '', duration: int = 0,
+                 subLogs: list = None) -> None:
+        self.commandName = commandName
+        self.args = args
+        self.result = result
+        # most commands don't have sub logs, list created when required
+        self._subLogs = subLogs
+        self.duration = duration
 
     @property
     def args(self) -> list:
-        return self.__args
+        return self._args
 
     @args.setter
     def args(self, value: list) -> None:
-        self.__args = list(map(str, value)) if value else []
+        self._args = list(map(str, value)) if value else []
 
     @property
     def result(self) -> str:
-        return self.__result
+        return self._result
 
     @result.setter
     def result(self, value: str) -> None:
-        self.__result = str(value)
+        self._result = str(value)
 
     @property
     def subLogs(self) -> list:
-        return self.__subLogs
+        if self._subLogs is None:
+            self._subLogs = []
+        return self._subLogs
 
     @subLogs.setter
     def subLogs(self, value: list):
-        self.__subLogs = value
+        self._subLogs = value
 
     def add_subLogs(self, sub_log: "CommandLogBean") -> None:
-        self.__subLogs.append(sub_log)
-
-    @property
-    def duration(self) -> int:
-        return self.__duration
-
-    @duration.setter
-    def duration(self, value: int) -> None:
-        self.__duration = value
+        self.subLogs.append(sub_log)
 
     def to_json_dict(self) -> dict:
         # args_array = []
@@ -84,15 +74,22 @@ class CommandLogBean:
 
         _dict = {
             "commandName": self.commandName,
-            "args": self.args,
-            "result": self.result,
-            "subLogs": self.subLogs,
+            "args": self._args,
+            "result": self._result,
+            # includes entries spilled to file by command log store
+            "subLogs": list(self._subLogs) if self._subLogs else [],
             "duration": self.duration,
         }
         return _dict
 
+    @classmethod
+    def from_json_dict(cls, _dict: dict) -> "CommandLogBean":
+        sub_logs = _dict.get("subLogs")
+        return cls(_dict.get("commandName", ''), _dict.get("args"), _dict.get("result", ''), _dict.get("duration", 0),
+                   [cls.from_json_dict(sub_log) for sub_log in sub_logs] if sub_logs else None)
+
     def to_string(self) -> str:
-        string = f'Command: {self.commandName} {self.args} {self.result}'
+        string = f'Command: {self.commandName} {self._args} {self.result}'
         # for key, value in self.args.items():
         #     string = string + ' ' + str(key) + ':' + str(value)
         # string = string + str(self.result)
@@ -0,0 +1,166 @@
+#  Copyright (c) 2022 Infostretch Corporation
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#  #
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import json
+import os
+import tempfile
+import weakref
+from itertools import islice
+from threading import Lock
+
+from qaf.automation.core.command_log_bean import CommandLogBean
+
+"""
+Command log that keeps limited number of entries in memory. When limit is exceeded, older entries are written,
+as json lines, to append-only temporary file and read back as command logs when log is iterated,
+so memory doesn't grow with length of test.
+"""
+
+
+def _default(__o):
+    # same conversion as used by json reporter
+    return __o.to_json_dict() or __o.__dict__
+
+
+_encoder = json.JSONEncoder(default=_default)
+
+
+class CommandLogStore(list):
+    """
+    List of command logs having at most `max_entries` entries in memory, zero or less for no limit.
+    Iteration and length include spilled entries, read back as `CommandLogBean`, while indexing is limited to
+    in-memory entries. Use `list(store)` to get all entries, json encoder doesn't see spilled entries.
+    Last entry, which can be log of step in progress, is never spilled.
+    Copy shares spilled entries, so it is cheap to hand over log of completed test to result updator.
+    """
+    __slots__ = ('max_entries', '_spill_file', '_spilled')
+
+    def __init__(self, max_entries: int = 0, entries=()):
+        super().__init__(entries)
+        self.max_entries = max_entries
+        self._spill_file = None
+        self._spilled = 0
+
+    def append(self, entry) -> None:
+        super().append(entry)
+        if 0 < self.max_entries < super().__len__():
+            self._spill()
+
+    def clear(self) -> None:
+        super().clear()
+        self._spill_file = None
+        self._spilled = 0
+
+    def copy(self) -> "CommandLogStore":
+        copy = CommandLogStore(self.max_entries, super().__iter__())
+        copy._spill_file = self._spill_file
+        copy._spilled = self._spilled
+        return copy
+
+    @property
+    def spilled(self) -> int:
+        return self._spilled
+
+    def __iter__(self):
+        if self._spilled:
+            yield from self._spill_file.read(self._spilled)
+        yield from super().__iter__()
+
+    def __len__(self) -> int:
+        return self._spilled + super().__len__()
+
+    def __reduce__(self):
+        # copy or pickle with spilled entries in memory
+        return CommandLogStore, (self.max_entries, list(self))
+
+    def _spill(self) -> None:
+        try:
+            if self._spill_file is None:
+                self._spill_file = _SpillFile()
+            self._spilled += self._spill_file.write(self[:-1])
+        except (OSError, TypeError, ValueError):
+            # keep in memory
+            self.max_entries = 0
+            return
+        del self[:-1]
+
+
+class _SpillFile:
+    """
+    Append-only file of spilled entries, removed when no more referenced by store or its copy.
+    """
+    __slots__ = ('path', '_lock', '__weakref__')
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(prefix='qaf-commandlog-', suffix='.jsonl')
+        os.close(fd)
+        self._lock = Lock()
+        weakref.finalize(self, _remove, self.path)
+
+    def write(self, entries: list) -> int:
+        lines = [_encode(entry) + "\n" for entry in entries]
+        with self._lock, open(self.path, 'a', encoding='UTF-8') as fp:
+            fp.writelines(lines)
+        return len(lines)
+
+    def read(self, count: int):
+        for line in self.lines(count):
+            yield CommandLogBean.from_json_dict(json.loads(line))
+
+    def lines(self, count: int):
+        with open(self.path, encoding='UTF-8') as fp:
+            for line in islice(fp, count):
+                yield line.rstrip("\n")
+
+
+def _encode(entry) -> str:
+    """
+    Returns json of log entry, with sub logs including their spilled entries as they are.
+    """
+    if isinstance(entry, CommandLogBean):
+        sub_logs = entry._subLogs
+        if not sub_logs:
+            return _encoder.encode(entry.to_json_dict())
+        # without reading spilled sub logs back
+        _dict = {"commandName": entry.commandName, "args": entry.args, "result": entry.result,
+                 "duration": entry.duration}
+    else:
+        _dict = entry.to_json_dict() if hasattr(entry, "to_json_dict") else entry
+        sub_logs = _dict.get("subLogs") if isinstance(_dict, dict) else None
+        if not sub_logs:
+            return _encoder.encode(_dict)
+        _dict = {k: v for k, v in _dict.items() if k != "subLogs"}
+    sub_logs = ", ".join(_encode_all(sub_logs))
+    return f'{_encoder.encode(_dict)[:-1]}{", " if _dict else ""}"subLogs": [{sub_logs}]}}'
+
+
+def _encode_all(entries):
+    if isinstance(entries, CommandLogStore):
+        if entries.spilled:
+            yield from entries._spill_file.lines(entries.spilled)
+        entries = list.__iter__(entries)
+    for entry in entries:
+        yield _encode(entry)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
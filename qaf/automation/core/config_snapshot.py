@@ -0,0 +1,157 @@
+#  Copyright (c) 2022 Infostretch Corporation
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#  #
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import argparse
+import logging
+import os
+import pickle
+import sys
+
+"""
+Snapshot of loaded configuration, to start bundle without reading and parsing resource files again.
+Set environment variable `QAF_CONFIG_SNAPSHOT` to use snapshot: when snapshot is valid, bundle is restored from it,
+otherwise resources are loaded and snapshot is written for subsequent processes, for instance xdist workers.
+Snapshot is valid as long as resource files, resource directory content, working directory
+and environment variables overriding loaded properties are same.
+
+Snapshot contains values of decrypted properties, keep it out of shared locations.
+
+usage: python -m qaf.automation.core.config_snapshot build [-o snapshot-file]
+       python -m qaf.automation.core.config_snapshot validate [snapshot-file]
+"""
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_FILE = os.path.join(".qaf_cache", "config-snapshot.pickle")
+
+
+def save(bundle, snapshot_file: str) -> None:
+    """
+    Writes snapshot of loaded bundle.
+    """
+    from qaf.automation.util.cache_util import file_signature, write_pickle
+    from qaf.automation.core.configurations_manager import APPLICATION_PROPERTIES
+
+    properties = dict(bundle)
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "cwd": os.getcwd(),
+        "application_properties": os.path.exists(APPLICATION_PROPERTIES),
+        "resource_path": bundle.resource_path,
+        "dirs": {resource_dir: _list_files(resource_dir) for resource_dir in bundle.resource_dirs},
+        "files": {file: file_signature(file) for file in bundle.resource_files},
+        "environ": _environ_overrides(properties),
+        "properties": properties,
+    }
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(snapshot_file)), exist_ok=True)
+        write_pickle(snapshot_file, snapshot)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        # continue without snapshot, for instance when a property has value that can't be pickled
+        logging.getLogger().exception(f"Unable to write configuration snapshot {snapshot_file}")
+
+
+def restore(bundle, snapshot_file: str) -> bool:
+    """
+    Loads bundle from snapshot, returns False when snapshot is missing or not valid.
+    """
+    snapshot = load(snapshot_file)
+    if snapshot is None:
+        return False
+    dict.update(bundle, snapshot["properties"])
+    bundle.resource_path = snapshot["resource_path"]
+    bundle.resource_dirs = dict.fromkeys(snapshot["dirs"])
+    bundle.resource_files = dict.fromkeys(snapshot["files"])
+    return True
+
+
+def load(snapshot_file: str):
+    """
+    Returns snapshot if it is valid, None otherwise.
+    """
+    from qaf.automation.util.cache_util import load_pickle
+    snapshot = load_pickle(snapshot_file)
+    return snapshot if snapshot and validate(snapshot) is None else None
+
+
+def validate(snapshot: dict):
+    """
+    Returns reason why snapshot is not valid, None if valid.
+    """
+    from qaf.automation.util.cache_util import check_signature
+    from qaf.automation.core.configurations_manager import APPLICATION_PROPERTIES
+
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return "different snapshot version"
+    if snapshot["cwd"] != os.getcwd():
+        return f"created in different directory {snapshot['cwd']}"
+    if snapshot["application_properties"] != os.path.exists(APPLICATION_PROPERTIES):
+        return f"{APPLICATION_PROPERTIES} added or removed"
+    for resource_dir, files in snapshot["dirs"].items():
+        if _list_files(resource_dir) != files:
+            return f"files added or removed in {resource_dir}"
+    for file, signature in snapshot["files"].items():
+        if check_signature(file, signature) is None:
+            return f"{file} changed"
+    if _environ_overrides(snapshot["properties"]) != snapshot["environ"]:
+        return "environment variables overriding properties changed"
+    return None
+
+
+def _list_files(resource_dir) -> list:
+    return sorted(os.path.join(root, file) for root, dirs, files in os.walk(resource_dir) for file in files)
+
+
+def _environ_overrides(properties: dict) -> dict:
+    # loaded value of property is replaced by environment variable with same name
+    return {key: value for key, value in os.environ.items() if key in properties}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m qaf.automation.core.config_snapshot",
+                                     description="Build or validate configuration snapshot.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="load resources and write snapshot")
+    build_parser.add_argument("-o", "--output", default=DEFAULT_SNAPSHOT_FILE, help="snapshot file to write")
+    validate_parser = commands.add_parser("validate", help="check snapshot against resources")
+    validate_parser.add_argument("file", nargs="?", default=DEFAULT_SNAPSHOT_FILE, help="snapshot file to check")
+    options = parser.parse_args(args)
+
+    if options.command == "build":
+        from qaf.automation.keys.application_properties import ApplicationProperties as AP
+        # load resources, not existing snapshot
+        os.environ.pop(AP.CONFIG_SNAPSHOT_FILE, None)
+        from qaf.automation.core.configurations_manager import ConfigurationsManager
+        bundle = ConfigurationsManager.get_bundle()
+        save(bundle, options.output)
+        print(f"{len(bundle)} properties from {len(bundle.resource_files)} files written to {options.output}")
+        return 0
+
+    from qaf.automation.util.cache_util import load_pickle
+    snapshot = load_pickle(options.file)
+    reason = validate(snapshot) if snapshot is not None else "snapshot not found or not readable"
+    if reason:
+        print(f"{options.file} is not valid: {reason}")
+        return 1
+    print(f"{options.file} is valid")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,6 +32,8 @@ __all__ = [
     "expression", "get_bundle", "ConfigurationsManager"
 ]
 
+APPLICATION_PROPERTIES = os.path.join('resources', 'application.properties')
+
 
 class ConfigurationsManager(metaclass=Singleton):
     """
@@ -40,10 +42,17 @@ class ConfigurationsManager(metaclass=Singleton):
 
     def __init__(self):
         self.__dict = PropertyUtil()
-        application_properties_path = os.path.join('resources', 'application.properties')
-        if os.path.exists(application_properties_path):
-            self.__dict.load(application_properties_path)
+        # snapshot file can only be provided as environment variable, it is used before loading any resource
+        snapshot_file = os.environ.get(AP.CONFIG_SNAPSHOT_FILE)
+        if snapshot_file:
+            from qaf.automation.core import config_snapshot
+            if config_snapshot.restore(self.__dict, snapshot_file):
+                return
+        if os.path.exists(APPLICATION_PROPERTIES):
+            self.__dict.load(APPLICATION_PROPERTIES)
         self.__dict.load(self.__dict.get_string(AP.RESOURCES))
+        if snapshot_file:
+            config_snapshot.save(self.__dict, snapshot_file)
 
     def contains_key(self, key: str) -> bool:
         """
@@ -26,6 +26,9 @@ from qaf.automation.core.checkpoint_bean import CheckPointBean
 from qaf.automation.core.message_type import MessageType
 from qaf.automation.core.test_base import add_checkpoint, take_screenshot
 
+# message types logged with failure screenshot
+_FAILURE_TYPES = (MessageType.Fail, MessageType.TestStepFail, MessageType.ERROR, MessageType.CRITICAL)
+
 
 class Reporter:
     """
@@ -122,6 +125,7 @@ class Reporter:
 
     @staticmethod
     def log_with_screenshot(message: str, message_type: Optional[MessageType] = MessageType.Info) -> None:
-        filename = take_screenshot() #os.path.join(os.getenv('REPORT_DIR'), 'img', str(uuid.uuid4()) + '.png')
+        success = message_type not in _FAILURE_TYPES
+        filename = take_screenshot(success) #os.path.join(os.getenv('REPORT_DIR'), 'img', str(uuid.uuid4()) + '.png')
         #qaf_test_base.QAFTestBase().get_driver().save_screenshot(filename=filename)
         Reporter.add_check_point(message, message_type, screen_shot=filename)
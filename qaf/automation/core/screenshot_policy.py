@@ -0,0 +1,98 @@
+#  Copyright (c) 2022 Infostretch Corporation
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#  #
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import time
+
+from qaf.automation.core.configurations_manager import ConfigurationsManager as CM
+from qaf.automation.keys.application_properties import ApplicationProperties as AP
+
+"""
+Decides whether screenshot requested during test is taken, reused from last capture or skipped,
+so that failing tests don't spend most of their time in screenshot round-trips to remote driver.
+"""
+
+# cheap fingerprint of page, same while page is not changed
+DOM_HASH_SCRIPT = """
+var s = document.documentElement ? document.documentElement.outerHTML : '';
+var h = 0;
+for (var i = 0; i < s.length; i++) { h = (h * 31 + s.charCodeAt(i)) | 0; }
+return [location.href, window.scrollX, window.scrollY, window.innerWidth, window.innerHeight, s.length, h].join('|');
+"""
+
+
+class CaptureState:
+    """
+    Screenshots taken during test, reset with test.
+    """
+    __slots__ = ('count', 'step', 'step_count', 'last_time', 'last_file', 'last_driver', 'last_dom')
+
+    def __init__(self):
+        self.count = 0
+        self.step = None
+        self.step_count = 0
+        self.last_time = 0
+        self.last_file = ""
+        self.last_driver = None
+        self.last_dom = None
+
+
+def is_enabled(success: bool) -> bool:
+    if success:
+        return CM.get_bundle().get_boolean(AP.SUCEESS_SCREENSHOT, True)
+    return CM.get_bundle().get_boolean(AP.FAILURE_SCREENSHOT, True)
+
+
+def capture(state: CaptureState, driver, step, take) -> str:
+    """
+    Returns screenshot file taken using `take` or reused from last capture with same driver.
+    Returns empty string when budget of test or step is exhausted.
+    """
+    bundle = CM.get_bundle()
+    if state.step is not step:
+        state.step = step
+        state.step_count = 0
+    reusable = state.last_file and state.last_driver is driver
+    now = time.monotonic()
+    if reusable and (now - state.last_time) * 1000 < bundle.get_int(AP.SCREENSHOT_MIN_INTERVAL, 0):
+        return state.last_file
+    max_per_test = bundle.get_int(AP.SCREENSHOT_MAX_PER_TEST, 0)
+    max_per_step = bundle.get_int(AP.SCREENSHOT_MAX_PER_STEP, 0)
+    if 0 < max_per_test <= state.count or 0 < max_per_step <= state.step_count:
+        return ""
+    dom = _dom_hash(driver) if bundle.get_boolean(AP.SCREENSHOT_REUSE_UNCHANGED, False) else None
+    if reusable and dom is not None and dom == state.last_dom:
+        return state.last_file
+    filename = take()
+    if filename:
+        state.count += 1
+        state.step_count += 1
+        state.last_time = time.monotonic()
+        state.last_file = filename
+        state.last_driver = driver
+        state.last_dom = dom
+    return filename
+
+
+def _dom_hash(driver):
+    try:
+        # on wrapped driver, to not notify command listeners and add script to command log
+        return getattr(driver, "under_laying_driver", driver).execute_script(DOM_HASH_SCRIPT)
+    except Exception:
+        # not a browser or page not accessible, alert for instance
+        return None
@@ -0,0 +1,178 @@
+#  Copyright (c) 2022 Infostretch Corporation
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#  #
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from qaf.automation.core.configurations_manager import ConfigurationsManager as CM
+from qaf.automation.keys.application_properties import ApplicationProperties as AP
+
+"""
+Writes screenshots in background, so test thread only waits for driver to take screenshot.
+At most `screenshot.max.pending` screenshots wait to be decoded and written, capture blocks when limit is reached.
+Screenshots are named by content, so identical screenshots share one file, written once.
+"""
+
+WORKERS = min(4, os.cpu_count() or 1)
+# number of recent screenshots remembered to reuse file or perceptual hash, older ones are written again when repeated
+MAX_REMEMBERED = 4096
+
+_lock = threading.Lock()
+_executor = None
+_pending = None
+# directories known to exist
+_dirs = set()
+# recent files written or being written, least recently used first
+_saved = OrderedDict()
+# size of perceptual hash, in pixels per side
+HASH_SIZE = 8
+_pillow_missing = False
+# perceptual hash based name by content hash, least recently used first
+_perceptual_names = OrderedDict()
+
+
+def save(directory: str, payload: str) -> str:
+    """
+    Saves base64 encoded png screenshot in directory, unless same screenshot is already saved, and returns file name.
+    Depending on `screenshot.dedup`, screenshots having same content (exact), looking same (perceptual) or none
+    (false) share file.
+    """
+    filename = os.path.join(directory, _name(payload) + '.png')
+    with _lock:
+        if filename in _saved:
+            _saved.move_to_end(filename)
+            return filename
+        _remember(_saved, filename, None)
+    write(filename, payload)
+    return filename
+
+
+def write(filename: str, payload: str) -> None:
+    """
+    Writes base64 encoded png screenshot to file, in background unless `screenshot.max.pending` is 0.
+    """
+    max_pending = CM.get_bundle().get_int(AP.SCREENSHOT_MAX_PENDING, 16)
+    if max_pending <= 0:
+        _write(filename, payload)
+        return
+    executor, pending = _get_executor(max_pending)
+    pending.acquire()
+    try:
+        future = executor.submit(_write, filename, payload)
+    except RuntimeError:
+        # flushed in between
+        pending.release()
+        _write(filename, payload)
+        return
+    future.add_done_callback(lambda _: pending.release())
+
+
+def flush() -> None:
+    """
+    Waits till pending screenshots are written.
+    """
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _get_executor(max_pending: int) -> tuple:
+    global _executor, _pending
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="qaf-screenshot")
+            if _pending is None:
+                _pending = threading.BoundedSemaphore(max_pending)
+        return _executor, _pending
+
+
+def _write(filename: str, payload: str) -> None:
+    try:
+        directory = os.path.dirname(filename)
+        if directory not in _dirs:
+            os.makedirs(directory, exist_ok=True)
+            _dirs.add(directory)
+        with open(filename, 'wb') as fp:
+            fp.write(base64.b64decode(payload))
+    except Exception:
+        with _lock:
+            _saved.pop(filename, None)
+        logging.getLogger().exception("Unable to write screenshot " + filename)
+
+
+def _name(payload: str) -> str:
+    dedup = CM.get_bundle().get_string(AP.SCREENSHOT_DEDUP, "exact").lower()
+    if dedup not in ("exact", "perceptual", "true"):
+        return str(uuid.uuid4())
+    name = hashlib.sha1(payload.encode('ascii')).hexdigest()
+    if dedup == "perceptual":
+        # identical screenshot doesn't need to be decoded again
+        with _lock:
+            perceptual_name = _perceptual_names.get(name)
+            if perceptual_name is not None:
+                _perceptual_names.move_to_end(name)
+                return perceptual_name
+        digest = _perceptual_hash(payload)
+        perceptual_name = "p" + digest if digest else name
+        with _lock:
+            _remember(_perceptual_names, name, perceptual_name)
+        return perceptual_name
+    return name
+
+
+def _remember(entries: OrderedDict, key, value) -> None:
+    # called holding _lock
+    entries[key] = value
+    entries.move_to_end(key)
+    if len(entries) > MAX_REMEMBERED:
+        entries.popitem(last=False)
+
+
+def _perceptual_hash(payload: str):
+    """
+    Difference hash of screenshot, same for screenshots differing only in small details. Requires Pillow.
+    """
+    global _pillow_missing
+    try:
+        from PIL import Image
+    except ImportError:
+        if not _pillow_missing:
+            _pillow_missing = True
+            logging.getLogger().warning("Pillow is required for perceptual screenshot dedup, using exact dedup")
+        return None
+    try:
+        with Image.open(io.BytesIO(base64.b64decode(payload))) as image:
+            pixels = list(image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE)).getdata())
+    except Exception:
+        return None
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            offset = row * (HASH_SIZE + 1) + col
+            value = value << 1 | (pixels[offset] > pixels[offset + 1])
+    return f'{value:0{HASH_SIZE * HASH_SIZE // 4}x}'
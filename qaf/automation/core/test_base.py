@@ -21,13 +21,14 @@ import atexit
 import os
 import re
 import time
-import uuid
 from builtins import dict
+from contextvars import ContextVar
 from time import strftime
 
-from qaf.automation.core import get_bundle
+from qaf.automation.core import get_bundle, screenshot_policy, screenshot_writer
 from qaf.automation.core.checkpoint_bean import CheckPointBean
 from qaf.automation.core.command_log_bean import CommandLogBean
+from qaf.automation.core.command_log_store import CommandLogStore
 from qaf.automation.core.message_type import MessageType
 from qaf.automation.keys.application_properties import ApplicationProperties as qafKeys
 from qaf.automation.ui.webdriver.driver_factory import create_driver
@@ -42,8 +43,13 @@ QAF_CHECKPOINTS_KEY = "checkPointResults"
 QAF_CONTEXT_KEY = "__qaftestbase_ctx"
 QAF_DRIVER_CONTEXT_KEY = "__driver_ctx"
 QAF_TEST_CONTEXT_KEY = "test_context"
+QAF_SCREENSHOT_STATE_KEY = "_screenshot_state"
+QAF_STEP_TRACKER_KEY = "_step_tracker"
 
 QAF_VERIFICATION_ERRORS_KEY = "verificationErrors"
+_execution_context: ContextVar[dict] = ContextVar("qaf_execution_context")
+# driver map by id, of each context having driver, to quit drivers of all threads and tasks on shut down
+_driver_contexts = {}
 OUTPUT_TEST_RESULTS_DIR = get_bundle().get_or_set('test.results.dir',
                                                   os.environ.get('test.results.dir', "test-results"))
 REPORT_DIR = get_bundle().get_or_set('json.report.root.dir',
@@ -63,6 +69,7 @@ def get_driver(name=None):
     driver_ctx = _get_driver_ctx()
     if driver_name not in driver_ctx and not prepareForShutdown:
         driver_ctx[driver_name] = create_driver(driver_name.lower())
+        _driver_contexts[id(driver_ctx)] = driver_ctx
     if driver_name.lower() != get_bundle().get_string(qafKeys.DRIVER_NAME, "").lower():
         get_bundle().set_property(qafKeys.DRIVER_NAME, driver_name)
         # set driver/browser specific resources
@@ -74,11 +81,16 @@ def get_driver(name=None):
 
 
 def set_driver(driver_name, driver):
-    _get_driver_ctx()[driver_name] = driver
+    driver_ctx = _get_driver_ctx()
+    driver_ctx[driver_name] = driver
+    _driver_contexts[id(driver_ctx)] = driver_ctx
 
 
 def tear_down(driver_name=None):
-    driver_ctx = _get_driver_ctx()
+    _quit_drivers(_get_driver_ctx(), driver_name)
+
+
+def _quit_drivers(driver_ctx, driver_name=None):
     if driver_name:
         if driver_name in driver_ctx:
             driver = driver_ctx.pop(driver_name)
@@ -89,6 +101,8 @@ def tear_down(driver_name=None):
             driver = driver_ctx.pop(k)
             if driver:
                 driver.quit()
+    if not driver_ctx:
+        _driver_contexts.pop(id(driver_ctx), None)
 
 
 def _get_driver_ctx():
@@ -96,19 +110,41 @@ def _get_driver_ctx():
 
 
 def context() -> dict:
-    return get_bundle().get_or_set(QAF_CONTEXT_KEY, _empty_context())
+    """
+    Execution context of current thread or asyncio task, holding drivers, command log, checkpoints,
+    verification errors and current step. Each thread gets its own context on first use.
+    """
+    ctx = _execution_context.get(None)
+    if ctx is None:
+        ctx = new_context()
+    return ctx
+
+
+def new_context() -> dict:
+    """
+    Starts new execution context for current thread or asyncio task.
+    asyncio task starts with context of its creator, so a task running a test
+    should call this first to not share drivers and logs with other tasks.
+    """
+    ctx = _empty_context()
+    _execution_context.set(ctx)
+    return ctx
 
 
 def _empty_context():
     ctx = dict()
     ctx[QAF_DRIVER_CONTEXT_KEY] = {}
-    ctx[QAF_COMMAND_LOG_KEY] = []
+    ctx[QAF_COMMAND_LOG_KEY] = _new_command_logs()
     ctx[QAF_CHECKPOINTS_KEY] = []
     ctx[QAF_VERIFICATION_ERRORS_KEY] = 0
     ctx[QAF_TEST_CONTEXT_KEY] = None
     return ctx
 
 
+def _new_command_logs() -> CommandLogStore:
+    return CommandLogStore(get_bundle().get_int(qafKeys.COMMAND_LOG_MAX_ENTRIES, 1000))
+
+
 def clear_assertions_log():
     get_checkpoint_results().clear()
     clear_verification_errors()
@@ -118,6 +154,7 @@ def clear_assertions_log():
         context().pop("_current_step")
     if "last_captured_screenshot" in context():
         context().pop("last_captured_screenshot")
+    context().pop(QAF_SCREENSHOT_STATE_KEY, None)
 
 
 def clear_verification_errors():
@@ -140,6 +177,17 @@ def set_test_context(test_context):
     context()[QAF_TEST_CONTEXT_KEY] = test_context
 
 
+def get_step_tracker():
+    """
+    Returns tracker of the bdd step being executed in current context, None when not executing a bdd step.
+    """
+    return context().get(QAF_STEP_TRACKER_KEY)
+
+
+def set_step_tracker(step_tracker):
+    context()[QAF_STEP_TRACKER_KEY] = step_tracker
+
+
 def get_verification_errors() -> int:
     return int(context()[QAF_VERIFICATION_ERRORS_KEY])
 
@@ -172,7 +220,12 @@ def end_step(status: bool, result=None):
 
 
 def add_command(log: CommandLogBean) -> None:
-    _get_step_logger().add_log(log)
+    current_step = context().get("_current_step")
+    if current_step is None:
+        # outside step, no need of step logger
+        get_command_logs().append(log)
+    else:
+        current_step.add_log(log)
 
 
 def add_checkpoint(checkpoint: CheckPointBean) -> None:
@@ -181,7 +234,11 @@ def add_checkpoint(checkpoint: CheckPointBean) -> None:
         context()[QAF_VERIFICATION_ERRORS_KEY] = verification_errors
         if not checkpoint.screenshot:
             checkpoint.screenshot = take_screenshot()
-    _get_step_logger().add_checkpoint(checkpoint)
+    current_step = context().get("_current_step")
+    if current_step is None:
+        get_checkpoint_results().append(checkpoint)
+    else:
+        current_step.add_checkpoint(checkpoint)
 
 
 def _get_step_logger():
@@ -195,14 +252,19 @@ def _set_cur_step(step):
     context()["_current_step"] = step
 
 
-def take_screenshot() -> str:
+def take_screenshot(success: bool = False) -> str:
     filename = ""
-    if has_driver():
+    if has_driver() and screenshot_policy.is_enabled(success):
         try:
-            os.makedirs(name=os.path.join(REPORT_DIR, 'img'), exist_ok=True)
-            filename = os.path.join(REPORT_DIR, 'img', str(uuid.uuid4()) + '.png')
-            get_driver().save_screenshot(filename=filename)
-            context()["last_captured_screenshot"] = filename
+            driver = get_driver()
+            if QAF_SCREENSHOT_STATE_KEY not in context():
+                context()[QAF_SCREENSHOT_STATE_KEY] = screenshot_policy.CaptureState()
+            # decoded and written in background, once for same screenshot
+            filename = screenshot_policy.capture(
+                context()[QAF_SCREENSHOT_STATE_KEY], driver, context().get("_current_step"),
+                lambda: screenshot_writer.save(os.path.join(REPORT_DIR, 'img'), driver.get_screenshot_as_base64()))
+            if filename:
+                context()["last_captured_screenshot"] = filename
             return filename
         except Exception:
             return filename
@@ -213,7 +275,10 @@ def shut_down():
     global prepareForShutdown
     prepareForShutdown = True
     print("Preparing For Shut Down...")
-    tear_down()
+    # drivers of all threads and tasks
+    for driver_ctx in list(_driver_contexts.values()):
+        _quit_drivers(driver_ctx)
+    screenshot_writer.flush()
     # ResultUpdator.awaitTermination()
 
 
@@ -221,25 +286,20 @@ atexit.register(shut_down)
 
 
 class _StepLogger(object):
+    __slots__ = ('st_time', 'checkpoint', 'command_log', 'parent')
 
     def __init__(self, name, dispay_name, parent, args=None):
-        if args is None:
-            args = []
         self.st_time = round(time.time() * 1000)
-        checkpoint = CheckPointBean()
-        command_log = CommandLogBean()
-        self.checkpoint = checkpoint
-        self.command_log = command_log
         if not name or not parent:
-            self.checkpoint.subCheckPoints = get_checkpoint_results()
-            self.command_log.subLogs = get_command_logs()
+            self.checkpoint = CheckPointBean(subCheckPoints=get_checkpoint_results())
+            self.command_log = CommandLogBean(subLogs=get_command_logs())
             self.parent = self
         else:
+            self.checkpoint = checkpoint = CheckPointBean(message=dispay_name)
+            self.command_log = command_log = CommandLogBean(commandName=name, subLogs=_new_command_logs())
             try:
                 self.parent = parent
                 context()["_current_step"] = self
-                checkpoint.message = dispay_name
-                command_log.commandName = name
                 command_log.args = args
                 self.parent.add_log(command_log)
                 self.parent.add_checkpoint(checkpoint)
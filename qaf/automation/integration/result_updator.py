@@ -18,6 +18,7 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 import logging
+import threading
 from concurrent.futures import ThreadPoolExecutor
 
 from qaf.automation.core.configurations_manager import ConfigurationsManager as CM
@@ -42,11 +43,25 @@ def register_updaters():
 
 
 # result_updaters = register_updaters()
+_lock = threading.Lock()
+
+
+def _get_or_create(key, factory):
+    # created once, even when results are updated from concurrent threads
+    value = CM.get_bundle().get_raw_value(key)
+    if value is None:
+        with _lock:
+            value = CM.get_bundle().get_raw_value(key)
+            if value is None:
+                value = factory()
+                CM.get_bundle().set_runtime_property(key, value)
+    return value
+
 def submit_result(result, result_updater):
     try:
         logging.getLogger().info(
             result_updater.get_tool_name() + " updating::" + result.get_name() + " - " + result.status)
-        executor = CM.get_bundle().get_or_set("__executor", ThreadPoolExecutor(max_workers=1))
+        executor = _get_or_create("__executor", lambda: ThreadPoolExecutor(max_workers=1))
         executor.submit(result_updater.update_result, result)
     except Exception:
         logging.getLogger().exception(
@@ -56,7 +71,7 @@ def submit_result(result, result_updater):
 def update_result(result):
     # TODO: use executor https://docs.python.org/3/library/concurrent.futures.html
     # from multiprocessing import parent_process
-    result_updaters = CM.get_bundle().get_or_set("__result_updators", register_updaters())
+    result_updaters = _get_or_create("__result_updators", register_updaters)
     if result_updaters is not None:
         for result_updater in result_updaters:
             submit_result(result, result_updater)
@@ -58,5 +58,21 @@ class ApplicationProperties:
     EXECUTABLE_PATH = 'executable.path'
     TESTING_APPROACH = 'testing.approach'
     STEP_PROVIDER_PKG = 'step.provider.pkg'
+    STEP_MATCH_CACHE_SIZE = 'step.match.cache.size'
+    STEP_CATALOG = 'step.catalog.enabled'
+    STEP_MANIFEST_FILE = 'step.manifest.file'
+    CACHE_DIR = 'qaf.cache.dir'
+    FEATURE_CACHE = 'feature.cache.enabled'
+    FEATURE_PARSE_WORKERS = 'feature.parse.workers'
+    CONFIG_SNAPSHOT_FILE = 'QAF_CONFIG_SNAPSHOT'
+    LAZY_RESOURCES = 'resources.lazy.enabled'
+    SCENARIO_PARALLEL_WORKERS = 'scenario.parallel.workers'
+    COMMAND_LOG_MAX_ENTRIES = 'command.log.max.entries'
+    SCREENSHOT_MAX_PENDING = 'screenshot.max.pending'
+    SCREENSHOT_DEDUP = 'screenshot.dedup'
+    SCREENSHOT_MAX_PER_TEST = 'screenshot.max.per.test'
+    SCREENSHOT_MAX_PER_STEP = 'screenshot.max.per.step'
+    SCREENSHOT_MIN_INTERVAL = 'screenshot.min.interval'
+    SCREENSHOT_REUSE_UNCHANGED = 'screenshot.reuse.unchanged'
 
     SELENIUM_SINGLETON = 'selenium.singleton'
@@ -183,7 +183,7 @@ class JsonReporter(TestCaseResultUpdator):
                 "checkPoints": result.checkPoints,
                 "errorTrace": "\n".join(result.throwable) if isinstance(result.throwable, list) else result.throwable,
             }
-            self.write_to_file(scenario_file_path, _dict)
+            self.write_to_file(scenario_file_path, _dict, entries_key="seleniumLog")
 
             method_info = {
                 "index": 1,
@@ -226,6 +226,28 @@ class JsonReporter(TestCaseResultUpdator):
             return status_counter_to_match
 
     @staticmethod
-    def write_to_file(file_path, data):
+    def write_to_file(file_path, data, entries_key=None):
+        """
+        Writes data as json. Entries of list under `entries_key`, last key in sorted order, are iterated and encoded
+        one at a time, so command log, including entries spilled to file, is not held in memory as whole.
+        """
         with open(file_path, 'w') as fp:
-            json.dump(data, fp, sort_keys=True, indent=4, default=lambda __o: __o.to_json_dict() or __o.__dict__)
+            if entries_key is None or max(data) != entries_key:
+                json.dump(data, fp, sort_keys=True, indent=4, default=_to_json_dict)
+                return
+            head = {key: value for key, value in data.items() if key != entries_key}
+            fp.write(json.dumps(head, sort_keys=True, indent=4, default=_to_json_dict)[:-2] + ',\n' if head else '{\n')
+            fp.write(f'    {json.dumps(entries_key)}: [')
+            encoder = json.JSONEncoder(sort_keys=True, indent=4, default=_to_json_dict)
+            separator = '\n'
+            for entry in data[entries_key]:
+                fp.write(separator + ' ' * 8)
+                for chunk in encoder.iterencode(entry):
+                    # nested two levels, new lines in strings are escaped
+                    fp.write(chunk.replace('\n', '\n' + ' ' * 8))
+                separator = ',\n'
+            fp.write('\n    ]\n}' if separator != '\n' else ']\n}')
+
+
+def _to_json_dict(__o):
+    return __o.to_json_dict() or __o.__dict__
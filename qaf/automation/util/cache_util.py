@@ -0,0 +1,123 @@
+#  Copyright (c) 2022 Infostretch Corporation
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#  #
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+# module settings
+__version__ = '1.0.0'
+__all__ = [
+    'get_cache_dir',
+    'file_signature',
+    'check_signature',
+    'load_json',
+    'write_json',
+    'load_pickle',
+    'write_pickle',
+]
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from qaf.automation.core.configurations_manager import ConfigurationsManager as CM
+from qaf.automation.keys.application_properties import ApplicationProperties as AP
+
+
+def get_cache_dir(*sub_dirs, bundle=None) -> str:
+    """
+    Returns directory, under `qaf.cache.dir` (default .qaf_cache), to persist data between runs and processes.
+    Provide bundle when called while bundle is being loaded.
+    """
+    root_dir = (CM.get_bundle() if bundle is None else bundle).get_string(AP.CACHE_DIR, ".qaf_cache")
+    if not os.path.isdir(root_dir):
+        os.makedirs(root_dir, exist_ok=True)
+        # keep cache out of version control, same as .pytest_cache
+        with open(os.path.join(root_dir, ".gitignore"), "w") as f:
+            f.write("*\n")
+    cache_dir = os.path.join(root_dir, *sub_dirs)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def file_signature(path: str) -> list:
+    """
+    Returns [mtime_ns, size, sha1] of the file.
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    return [stat.st_mtime_ns, stat.st_size, digest]
+
+
+def check_signature(path: str, signature: list):
+    """
+    Check file against signature taken earlier using `file_signature`.
+    Content hash is compared only when modification time or size differs.
+    Returns given signature when file is not modified, new signature when file is touched but content is same,
+    None when file changed or is not readable.
+    """
+    try:
+        stat = os.stat(path)
+        if [stat.st_mtime_ns, stat.st_size] == signature[:2]:
+            return signature
+        current = file_signature(path)
+    except OSError:
+        return None
+    return current if current[1:] == signature[1:] else None
+
+
+def load_json(path: str, default=None):
+    try:
+        with open(path, encoding='UTF-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path: str, data) -> None:
+    """
+    Writes json to temp file and then replaces target, so parallel processes never read partial file.
+    """
+    _write(path, json.dumps(data).encode('UTF-8'))
+
+
+def load_pickle(path: str, default=None):
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # missing, partial or incompatible cache entry
+        return default
+
+
+def write_pickle(path: str, data) -> None:
+    _write(path, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _write(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or None, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
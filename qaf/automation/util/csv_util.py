@@ -24,10 +24,15 @@
 __version__ = '1.0.0'
 __all__ = [
     'get_csvdata_as_map',
+    'get_csvdata_as_table',
+    'DataTable',
+    'DataRow',
 ]
 
 import ast
 import csv
+from collections.abc import Sequence
+from copy import deepcopy
 
 
 def get_csvdata_as_map(csvfile):
@@ -40,8 +45,17 @@ def get_csvdata_as_map(csvfile):
         return get_list_of_map(csv_data)
 
 
+def get_csvdata_as_table(csvfile):
+    with open(csvfile, encoding='utf-8') as csvf:
+        csv_data = filter(lambda row: row.strip() and row.strip()[0] != '#', csvf)
+        return DataTable(iter_maps(csv_data))
+
+
 def get_list_of_map(csv_data, delimiter=","):
-    rows = []
+    return list(iter_maps(csv_data, delimiter))
+
+
+def iter_maps(csv_data, delimiter=","):
     csvReader = csv.DictReader(csv_data, delimiter=delimiter, skipinitialspace=True)
     for row in csvReader:
         first_key = next(iter(row))
@@ -51,5 +65,95 @@ def get_list_of_map(csv_data, delimiter=","):
                     row[key] = ast.literal_eval(val)
                 except:
                     pass
-            rows.append(row)
-    return rows
\ No newline at end of file
+            yield row
+
+class DataTable(Sequence):
+    """
+    Tabular data kept as header tuple and row tuples. Row as dict is created when accessed,
+    so each access gets its own row, same as reading data again.
+    """
+    __slots__ = ("header", "rows", "has_mutable_values", "_text")
+
+    def __init__(self, list_of_map=(), header: tuple = None, rows: tuple = None, has_mutable_values=None):
+        """
+        list_of_map: iterable of rows as dict, or header and rows as tuples
+        """
+        if rows is None:
+            rows = []
+            for row in list_of_map:
+                if header is None:
+                    header = tuple(row)
+                # row with irregular fields, for instance extra values, is kept as is
+                rows.append(tuple(row.values()) if tuple(row) == header else row)
+            header = header or ()
+            rows = tuple(rows)
+        self.header = header
+        self.rows = rows
+        self.has_mutable_values = any(isinstance(value, (list, dict, set)) for row in rows
+                                      for value in (row if type(row) is tuple else row.values())) \
+            if has_mutable_values is None else has_mutable_values
+        self._text = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.subset(range(len(self.rows))[index])
+        row = self.rows[index]
+        row = dict(zip(self.header, row)) if type(row) is tuple else dict(row)
+        return deepcopy(row) if self.has_mutable_values else row
+
+    def subset(self, indices) -> "DataTable":
+        return DataTable(header=self.header, rows=tuple(self.rows[index] for index in indices),
+                         has_mutable_values=self.has_mutable_values)
+
+    def column_values(self, *names) -> list:
+        """
+        Returns value of first available column, from given column names, for each row. None if none available.
+        """
+        values = []
+        for row in self.rows:
+            row_names = self.header if type(row) is tuple else tuple(row)
+            values.append(next((row[row_names.index(name)] if type(row) is tuple else row[name]
+                                for name in names if name in row_names), None))
+        return values
+
+    def to_list(self) -> list:
+        return list(self)
+
+    def to_json_dict(self):
+        return self.to_list()
+
+    @property
+    def text(self) -> str:
+        """
+        String representation of rows, same as of list of maps.
+        """
+        if self._text is None:
+            self._text = str(self.to_list())
+        return self._text
+
+
+class DataRow:
+    """
+    Reference to row of data table, to pass as test parameter without creating row until test needs it.
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: DataTable, index: int):
+        self.table = table
+        self.index = index
+
+    def get(self) -> dict:
+        return self.table[self.index]
+
+    def to_json_dict(self):
+        return self.get()
+
+    def __deepcopy__(self, memo):
+        # refers immutable data
+        return self
+
+    def __repr__(self):
+        return repr(self.get())
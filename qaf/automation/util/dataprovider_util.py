@@ -31,18 +31,19 @@ import re
 
 from qaf.automation.core.configurations_manager import ConfigurationsManager as CM
 from qaf.automation.util import csv_util
+from qaf.automation.util.csv_util import DataTable
 
 
-def get_testdata(dataprovider: dict, params: dict):
+def get_testdata(dataprovider: dict, params: dict) -> DataTable:
     dataprovider = {k.upper(): v for k, v in dataprovider.items()}
     # TODO: validate data provider
     if "DATAFILE" in dataprovider or "_DATAFILE" in dataprovider:
         datafile = CM.get_bundle().resolve(dataprovider.get("DATAFILE",dataprovider.get("_DATAFILE")), params)
         if re.search(r'(?i)\.csv$|\.txt$', datafile):
-            _testdata = csv_util.get_csvdata_as_map(datafile)
+            _testdata = csv_util.get_csvdata_as_table(datafile)
         elif datafile.lower().endswith(".json"):
             with open(datafile) as f:
-                _testdata = json.load(f)
+                _testdata = DataTable(json.load(f))
         else:
             raise NotImplemented
     elif "SQLQUERY" in dataprovider:
@@ -60,10 +61,12 @@ def _process(dataprovider: dict, params: dict, testdata):
         to = _toInt(dataprovider.get("TO"))
         return testdata[_from:to]
     if "INDICES" in dataprovider:
-        return [testdata[index] for index in dataprovider.get("INDICES")]
+        return testdata.subset(dataprovider.get("INDICES"))
     if "FILTER" in dataprovider:
         _filter = CM.get_bundle().resolve(dataprovider.get("FILTER"), params)
-        return list(filter(lambda rec: eval(_filter,None, rec), testdata))
+        # compiled once for all records
+        _filter = compile(_filter, "<filter>", "eval")
+        return testdata.subset(index for index, rec in enumerate(testdata) if eval(_filter, None, rec))
     return testdata
 
 
@@ -19,14 +19,118 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
-import json
 import os
 import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 
 from simpleeval import NameNotDefined, EvalWithCompoundTypes
 
+from qaf.automation.util import resource_index
+from qaf.automation.util.expression_util import parse_expression
 from qaf.automation.util.string_util import to_boolean, decode_base64, rnd
 
+_MISSING = object()
+RESOURCE_FILE_TYPES = ('.properties', '.loc', '.wsc', '.ini', '.wscj', '.locj')
+_EXPR_PATTERN = re.compile(r"<%([^>]+)%>")
+_PARAM_PATTERN = re.compile(r"\$\{([^}]+)\}")
+# placeholder types of compiled template
+_KEY, _EXPR, _RND, _BAD, _UNSUPPORTED = "key", "expr", "rnd", "bad", "unsupported"
+# longer strings, for instance request body, are compiled each time instead of being kept in cache
+MAX_CACHED_TEMPLATE_LENGTH = 8192
+# parsed resource file by path, with (mtime, size) of the file when parsed
+_parsed_files = {}
+
+
+def _compile_template(text, prefix, suffix, pattern) -> tuple:
+    """
+    Splits text into literal strings and (placeholder type, name) tuples.
+    """
+    if len(text) > MAX_CACHED_TEMPLATE_LENGTH:
+        return _compile_template_uncached(text, prefix, suffix, pattern)
+    return _compile_template_cached(text, prefix, suffix, pattern)
+
+
+def _compile_template_uncached(text, prefix, suffix, pattern) -> tuple:
+    parts = []
+    rest = text
+    while rest:
+        p = rest.find(prefix)
+        if p < 0:
+            parts.append(rest)
+            break
+        parts.append(rest[:p])
+        rest = rest[p:]
+        c = rest[1:2]
+        if c == prefix[0]:
+            parts.append(prefix[0])
+            rest = rest[2:]
+        elif c == prefix[1]:
+            m = pattern.match(rest)
+            if m is None:
+                parts.append((_BAD, rest))
+                break
+            path = m.group(1).split(':')
+            rest = rest[m.end():]
+            if len(path) == 1:
+                parts.append((_KEY, path[0]))
+            elif len(path) == 2:
+                sect, opt = path
+                parts.append(({'expr': _EXPR, 'rnd': _RND}.get(sect, _KEY), opt))
+            else:
+                parts.append((_UNSUPPORTED, None))
+        else:
+            parts.append(rest)
+            break
+    # join adjacent literals
+    merged = []
+    for part in parts:
+        if type(part) is str:
+            if not part:
+                continue
+            if merged and type(merged[-1]) is str:
+                merged[-1] += part
+                continue
+        merged.append(part)
+    return tuple(merged)
+
+
+_compile_template_cached = lru_cache(maxsize=2048)(_compile_template_uncached)
+
+
+def _parse_file(file) -> tuple:
+    """
+    Returns (key, value) entries of resource file and whether it has encrypted keys.
+    Parsed file is reused while file is unchanged, so switching back to already loaded resources
+    doesn't read and parse files again.
+    """
+    stat = os.stat(file)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    path = os.path.abspath(file)
+    parsed = _parsed_files.get(path)
+    if parsed is not None and parsed[0] == signature:
+        return parsed[1]
+    if os.path.splitext(file)[1] in resource_index.JSON_FILE_TYPES:
+        entries = tuple(resource_index.read_json(file).items())
+    else:
+        with open(file, 'rb') as fp:
+            entries = tuple((key, value) for offset, key, value in resource_index.read_entries(fp))
+    layer = (entries, any(key.startswith("encrypted.") for key, value in entries))
+    _parsed_files[path] = (signature, layer)
+    return layer
+
+
+class _Resolution:
+    """
+    Keys referred while resolving value of a key, and whether resolved value can be reused.
+    """
+    __slots__ = ("dependencies", "cacheable")
+
+    def __init__(self):
+        self.dependencies = set()
+        self.cacheable = True
+
 
 class PropertyUtil(dict):
     """
@@ -44,49 +148,130 @@ class PropertyUtil(dict):
         super(PropertyUtil, self).__init__(*args, **kw)
         self.loading_resources = False
         self.resource_path = ""
+        # resource directories walked and files read by load, dict used as ordered set
+        self.resource_dirs = {}
+        self.resource_files = {}
         self.evaluator = EvalWithCompoundTypes()
+        # resolved value by key, and keys to invalidate when a key changes
+        self._resolved = {}
+        self._dependents = {}
+        # incremented on each change, resolved value gets cached only when nothing changed while resolving
+        self._generation = 0
+        self._resolved_lock = threading.Lock()
+        # per thread state: resolutions and batch_update in progress
+        self._local = threading.local()
+        # (file, offset) by key not loaded yet, when resources are loaded lazily
+        self._lazy_index = {}
+        self._lazy_lock = threading.RLock()
 
     def load(self, resources_path: str) -> None:
 
         if self.resource_path == resources_path: return
         self.loading_resources = True
         self.resource_path = resources_path
+        lazy = self.get_boolean("resources.lazy.enabled", False)
         all_resources_path = resources_path.split(";") if resources_path else []
         for each_resource_path in all_resources_path:
             if os.path.isdir(each_resource_path):
+                self.resource_dirs[each_resource_path] = None
                 for root, dirs, files in os.walk(each_resource_path):
                     for file in files:
                         file_path = os.path.join(root, file)
-                        self.__load_file(file_path)
+                        self.__load_file(file_path, lazy)
 
             elif os.path.isfile(each_resource_path):
                 # self.__load_files(each_resource_path)
-                self.__load_file(each_resource_path)
+                self.__load_file(each_resource_path, lazy)
         self.loading_resources = False  # mark done
         if self.resource_path != self.get_string("env.resources", self.resource_path):
             self.load(self.get_string("env.resources", self.resource_path))
 
-    def __load_file(self, file):
+    def __load_file(self, file, lazy=False):
         extension = os.path.splitext(file)[1]
-        if extension in ('.properties', '.loc', '.wsc', '.ini'):
-            with open(file, 'r', encoding='UTF-8') as file:
-                while line := file.readline():
-                    kv = line.strip()
-                    if kv and not kv.startswith("#"):
-                        while kv.endswith("\\"):
-                            kv = kv[:-1]
-                            part = file.readline().strip()
-                            if part and not part.startswith("#"):
-                                kv = kv + part
-
-                        kv = kv.split("=", 1)
-                        if len(kv) == 2:
-                            self.set_property(key=kv[0].strip(), value=kv[1].strip())
-        elif extension in ('.wscj', '.locj'):
-            with open(file, 'r', encoding='UTF-8') as json_file:
-                data = json.load(json_file)
-                for key, value in data.items():
-                    self.set_property(key=key, value=json.dumps(value))
+        if extension in RESOURCE_FILE_TYPES:
+            self.resource_files[file] = None
+        if lazy and extension in resource_index.LAZY_FILE_TYPES and self.__index_file(file):
+            return
+        if extension in RESOURCE_FILE_TYPES:
+            self.__apply_layer(*_parse_file(file))
+
+    def __apply_layer(self, entries: tuple, has_encrypted: bool):
+        values = dict(entries)
+        if has_encrypted or not values.keys().isdisjoint(os.environ):
+            for key, value in entries:
+                self.set_property(key=key, value=value)
+            return
+        # same as set_property for each entry, when nothing to override or decrypt
+        super(PropertyUtil, self).update(values)
+        if self._lazy_index:
+            for key in values:
+                self._lazy_index.pop(key, None)
+        with self._resolved_lock:
+            self._generation += 1
+            if self._resolved:
+                for key in (self._resolved.keys() | self._dependents.keys()) & values.keys():
+                    self._drop_resolved(key)
+
+    def __index_file(self, file) -> bool:
+        """
+        Adds keys of file to lazy index, values are loaded on first access.
+        Returns False when file has keys that need to be loaded upfront.
+        """
+        # cache_util depends on configuration bundle
+        from qaf.automation.util.cache_util import get_cache_dir
+        try:
+            cache_dir = get_cache_dir("resource-index", bundle=self)
+        except OSError:
+            cache_dir = None
+        index = resource_index.get_index(file, cache_dir)
+        if any(key.startswith("encrypted.") or key == "env.resources" for key, offset in index):
+            return False
+        with self._lazy_lock:
+            for key, offset in index:
+                # same as loading file, value from this file overrides existing value
+                super(PropertyUtil, self).pop(key, None)
+                self._lazy_index[key] = (file, offset)
+                self._invalidate(key)
+        return True
+
+    def _load_lazy(self, key):
+        with self._lazy_lock:
+            entry = self._lazy_index.get(key)
+            if entry is None:
+                # loaded by other thread
+                return
+            file, offset = entry
+            if offset is None:
+                self._load_lazy_file(file)
+                return
+            value = resource_index.read_value(file, key, offset)
+            if value is None:
+                self._lazy_index.pop(key)
+            else:
+                # value is set before removing key from index, so key is visible to other threads all the time
+                self.__setitem__(key, os.environ.get(key, value))
+
+    def _load_lazy_file(self, file):
+        if os.path.splitext(file)[1] in resource_index.JSON_FILE_TYPES:
+            values = resource_index.read_json(file).items()
+        else:
+            with open(file, 'rb') as fp:
+                # last entry of a key wins, same as loading file
+                values = {key: value for offset, key, value in resource_index.read_entries(fp)}.items()
+        for key, value in values:
+            entry = self._lazy_index.get(key)
+            if entry is not None and entry[0] == file:
+                self.__setitem__(key, os.environ.get(key, value))
+        # keys not found in changed file
+        for key in [key for key, entry in self._lazy_index.items() if entry[0] == file]:
+            self._lazy_index.pop(key)
+
+    def _load_all_lazy(self):
+        if not self._lazy_index:
+            return
+        with self._lazy_lock:
+            for file in {file for file, offset in self._lazy_index.values()}:
+                self._load_lazy_file(file)
 
     def contains_key(self, key: str) -> bool:
         """
@@ -142,6 +327,43 @@ class PropertyUtil(dict):
             decrypt = self._decrypt_impl()
             d_val = decrypt(value)
             self.__setitem__(dkey, d_val)
+        if not self._batch_depth:
+            self._reload_if_required()
+
+    def set_runtime_property(self, key: str, value):
+        """
+        Sets value as is, for values framework sets during execution, for instance current test.
+        Unlike `set_property`, it doesn't check for environment variable, decrypt or reload resources.
+        """
+        self.__setitem__(key, value)
+
+    @contextmanager
+    def batch_update(self):
+        """
+        Context manager to set multiple properties, resources are reloaded, if `env.resources` changed,
+        once at the end of the block instead of checking on each `set_property`.
+
+        Example:
+            with get_bundle().batch_update() as bundle:
+                bundle.set_property("env.name", "qa")
+                bundle.set_property("env.resources", "resources/${env.name}")
+
+        Batch applies to `set_property` calls of current thread only, other threads reload as usual.
+        """
+        self._local.batch_depth = self._batch_depth + 1
+        try:
+            yield self
+        finally:
+            self._local.batch_depth -= 1
+            if not self._local.batch_depth:
+                self._reload_if_required()
+
+    @property
+    def _batch_depth(self) -> int:
+        # nesting level of batch_update in progress on current thread
+        return getattr(self._local, "batch_depth", 0)
+
+    def _reload_if_required(self):
         # do we need to reload resources?
         if not (self.loading_resources or self.resource_path == self.get_string("env.resources", self.resource_path)):
             self.load(self.get_string("env.resources"))
@@ -150,11 +372,107 @@ class PropertyUtil(dict):
         return self.get(key, default)
 
     def __getitem__(self, key, default=None):
-        return super(PropertyUtil, self).__getitem__(key) if self.__contains__(key) else default
+        if self._lazy_index and key in self._lazy_index:
+            self._load_lazy(key)
+        return super(PropertyUtil, self).get(key, default)
+
+    def __contains__(self, key):
+        return super(PropertyUtil, self).__contains__(key) or key in self._lazy_index
+
+    def __len__(self):
+        # a key is either loaded or in lazy index
+        return super(PropertyUtil, self).__len__() + len(self._lazy_index)
+
+    def __iter__(self):
+        self._load_all_lazy()
+        return super(PropertyUtil, self).__iter__()
+
+    def keys(self):
+        self._load_all_lazy()
+        return super(PropertyUtil, self).keys()
+
+    def values(self):
+        self._load_all_lazy()
+        return super(PropertyUtil, self).values()
+
+    def items(self):
+        self._load_all_lazy()
+        return super(PropertyUtil, self).items()
+
+    def copy(self):
+        self._load_all_lazy()
+        return super(PropertyUtil, self).copy()
+
+    def __setitem__(self, key, value):
+        super(PropertyUtil, self).__setitem__(key, value)
+        if self._lazy_index:
+            self._lazy_index.pop(key, None)
+        self._invalidate(key)
+
+    def __delitem__(self, key):
+        if self._lazy_index and key in self._lazy_index:
+            self._load_lazy(key)
+        super(PropertyUtil, self).__delitem__(key)
+        self._invalidate(key)
+
+    def pop(self, key, *args):
+        if self._lazy_index and key in self._lazy_index:
+            self._load_lazy(key)
+        value = super(PropertyUtil, self).pop(key, *args)
+        self._invalidate(key)
+        return value
+
+    def popitem(self):
+        item = super(PropertyUtil, self).popitem()
+        self._invalidate(item[0])
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self.__getitem__(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super(PropertyUtil, self).clear()
+        self._lazy_index.clear()
+        with self._resolved_lock:
+            self._generation += 1
+            self._resolved.clear()
+            self._dependents.clear()
 
     def get(self, key: str, default=None):
+        resolving = self._resolving()
+        if resolving:
+            resolving[-1].dependencies.add(key)
+        generation = self._generation
+        value = self._resolved.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
         value = self.get_raw_value(key)
-        return self.resolve(value) if value is not None else default
+        if value is None:
+            return default
+        if not (value and isinstance(value, str)):
+            return value
+        resolution = _Resolution()
+        resolving.append(resolution)
+        try:
+            value = self.resolve(value)
+        finally:
+            resolving.pop()
+        if resolution.cacheable:
+            with self._resolved_lock:
+                # value resolved from outdated values, when other thread changed any meanwhile, is not cached
+                if generation == self._generation:
+                    self._resolved[key] = value
+                    for dependency in resolution.dependencies:
+                        self._dependents.setdefault(dependency, set()).add(key)
+        elif resolving:
+            resolving[-1].cacheable = False
+        return value
 
     def get_or_set(self, key: str, default):
         if key not in self:
@@ -167,65 +485,71 @@ class PropertyUtil(dict):
     def interpolate(self, rest, prefix, suffix, pattern, ext_dict=None):
         if ext_dict is None:
             ext_dict = {}
+        if prefix not in rest:
+            return rest
         accum = []
-        while rest:
-            p = rest.find(prefix)
-            if p < 0:
-                accum.append(rest)
-                return ''.join(accum)
-            if p >= 0:
-                accum.append(rest[:p])
-                rest = rest[p:]
-            # p is no longer used
-            c = rest[1:2]
-            if c == prefix[0]:
-                accum.append(prefix[0])
-                rest = rest[2:]
-            elif c == prefix[1]:
-                m = pattern.match(rest)
-                if m is None:
-                    raise Exception(
-                        "bad interpolation variable reference %r" % rest)
-                path = m.group(1).split(':')
-                rest = rest[m.end():]
-                try:
-                    if len(path) == 1:
-                        opt = path[0]
-                        v = ext_dict.get(opt, self.get(opt, prefix + opt + suffix))
-                    elif len(path) == 2:
-                        sect = path[0]
-                        opt = path[1]
-                        if sect == 'expr':
-                            v = str(self._evalexpr(opt, ext_dict))
-                        elif sect == 'rnd':
-                            v = rnd(opt)
-                        else:
-                            v = ext_dict.get(opt, self.get(opt, prefix + opt + suffix))
-                    accum.append(str(v))
-                except Exception as e:
-                    raise e
-            else:
-                accum.append(rest)
-
+        for part in _compile_template(rest, prefix, suffix, pattern):
+            if type(part) is str:
+                accum.append(part)
+                continue
+            kind, opt = part
+            if kind is _KEY:
+                v = ext_dict.get(opt, self.get(opt, prefix + opt + suffix))
+            elif kind is _EXPR:
+                self._not_cacheable()
+                v = str(self._evalexpr(opt, ext_dict))
+            elif kind is _RND:
+                self._not_cacheable()
+                v = rnd(opt)
+            elif kind is _BAD:
+                raise Exception(
+                    "bad interpolation variable reference %r" % opt)
+            # for _UNSUPPORTED, value of previous placeholder gets repeated, as it used to be
+            accum.append(str(v))
         return ''.join(accum)
 
     def resolve(self, value, disc=None):
         if disc is None:
             disc = {}
         if value and isinstance(value, str):
-            pattern = re.compile(r"<%([^>]+)%>")
-            value = self.interpolate(value, "<%", "%>", pattern, disc)
-            pattern = re.compile(r"\$\{([^}]+)\}")
-            value = self.interpolate(value, "${", "}", pattern, disc)
+            value = self.interpolate(value, "<%", "%>", _EXPR_PATTERN, disc)
+            value = self.interpolate(value, "${", "}", _PARAM_PATTERN, disc)
             return value
         return value
 
     def _evalexpr(self, expr, vars):
         self.evaluator.names = vars if vars else {}
         try:
-            return self.evaluator.eval(expr)
+            return self.evaluator.eval(expr, parse_expression(expr))
         except NameNotDefined:
             return False
 
+    def _resolving(self) -> list:
+        """
+        Resolutions in progress on current thread, innermost last.
+        """
+        try:
+            return self._local.resolving
+        except AttributeError:
+            self._local.resolving = []
+            return self._local.resolving
+
+    def _not_cacheable(self):
+        # value differs on each resolve
+        resolving = self._resolving()
+        if resolving:
+            resolving[-1].cacheable = False
+
+    def _invalidate(self, key):
+        with self._resolved_lock:
+            self._generation += 1
+            if self._resolved:
+                self._drop_resolved(key)
+
+    def _drop_resolved(self, key):
+        self._resolved.pop(key, None)
+        for dependent in self._dependents.pop(key, ()):
+            self._drop_resolved(dependent)
+
     def _decrypt_impl(self):
         return self.get("password.decryptor.impl", decode_base64)
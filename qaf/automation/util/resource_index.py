@@ -0,0 +1,130 @@
+#  Copyright (c) 2022 Infostretch Corporation
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#  #
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import hashlib
+import json
+import os
+import pickle
+from typing import BinaryIO, Iterator
+
+"""
+Index of keys in locator and web-service call repositories, used by `PropertyUtil` with `resources.lazy.enabled`
+to load value of a key when it is used instead of loading whole repository.
+Index entry is key and byte offset of its entry in file, or None for json file which gets loaded as a whole.
+Index is persisted and reused as long as file is unchanged.
+"""
+
+# change when index format changes, to discard persisted index from older version
+INDEX_VERSION = 1
+LAZY_FILE_TYPES = ('.loc', '.wsc', '.locj', '.wscj')
+JSON_FILE_TYPES = ('.locj', '.wscj')
+
+
+def read_entries(file: BinaryIO) -> Iterator[tuple]:
+    """
+    Yields byte offset, key and value of each entry, from current position of properties format file
+    opened in binary mode. Value can continue on next line when line ends with backslash.
+    """
+    offset = file.tell()
+    while line := file.readline():
+        kv = line.decode('UTF-8').strip()
+        if kv and not kv.startswith("#"):
+            while kv.endswith("\\"):
+                kv = kv[:-1]
+                part = file.readline().decode('UTF-8').strip()
+                if part and not part.startswith("#"):
+                    kv = kv + part
+
+            kv = kv.split("=", 1)
+            if len(kv) == 2:
+                yield offset, kv[0].strip(), kv[1].strip()
+        offset = file.tell()
+
+
+def read_json(path: str) -> dict:
+    """
+    Returns entries of json file, with value as json string.
+    """
+    with open(path, 'r', encoding='UTF-8') as json_file:
+        data = json.load(json_file)
+    return {key: json.dumps(value) for key, value in data.items()}
+
+
+def read_value(path: str, key: str, offset: int):
+    """
+    Returns value of key from entry at offset in properties format file, None if key is not found.
+    """
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        for entry_offset, entry_key, value in read_entries(file):
+            if entry_key == key:
+                return value
+            break
+        # file changed after it was indexed
+        file.seek(0)
+        values = [value for entry_offset, entry_key, value in read_entries(file) if entry_key == key]
+    return values[-1] if values else None
+
+
+def get_index(path: str, cache_dir: str = None) -> list:
+    """
+    Returns list of key and offset for entries of file, from persisted index under cache_dir when file is unchanged.
+    """
+    # imported here as cache_util depends on configuration bundle
+    from qaf.automation.util.cache_util import file_signature, check_signature, load_pickle
+
+    cache_file = os.path.join(cache_dir, _cache_key(path) + ".pickle") if cache_dir else None
+    if cache_file:
+        entry = load_pickle(cache_file)
+        if entry and entry[0] == INDEX_VERSION:
+            signature, index = entry[1], entry[2]
+            current = check_signature(path, signature)
+            if current is not None:
+                if current is not signature:
+                    # touched but same content
+                    _save(cache_file, current, index)
+                return index
+
+    # signature before reading, so change during indexing gets detected next time
+    signature = file_signature(path)
+    index = build_index(path)
+    if cache_file:
+        _save(cache_file, signature, index)
+    return index
+
+
+def build_index(path: str) -> list:
+    if os.path.splitext(path)[1] in JSON_FILE_TYPES:
+        return [(key, None) for key in read_json(path)]
+    with open(path, 'rb') as file:
+        return [(key, offset) for offset, key, value in read_entries(file)]
+
+
+def _cache_key(path) -> str:
+    return hashlib.sha1(os.path.normcase(os.path.abspath(path)).encode('UTF-8')).hexdigest()
+
+
+def _save(cache_file, signature, index):
+    from qaf.automation.util.cache_util import write_pickle
+    try:
+        write_pickle(cache_file, (INDEX_VERSION, signature, index))
+    except (OSError, pickle.PicklingError):
+        # continue without persisted index
+        pass
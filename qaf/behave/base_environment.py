@@ -65,7 +65,7 @@ class BaseEnvironment:
         self.current_scenario = scenario
         self.startTime = current_timestamp()
         clear_assertions_log()
-        get_bundle().set_property(ApplicationProperties.CURRENT_TEST_NAME, scenario.name)
+        get_bundle().set_runtime_property(ApplicationProperties.CURRENT_TEST_NAME, scenario.name)
 
     def after_scenario(self, context, scenario):
 
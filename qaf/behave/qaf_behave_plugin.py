@@ -45,7 +45,7 @@ def add_before_scenario_hook(fun):
 
 def before_scenario(context, scenario):
     set_test_context(context)
-    get_bundle().set_property(ApplicationProperties.CURRENT_TEST_NAME, scenario.name)
+    get_bundle().set_runtime_property(ApplicationProperties.CURRENT_TEST_NAME, scenario.name)
     for user_hook in user_hooks['before_scenario']:
         user_hook(context, scenario)
     clear_assertions_log()
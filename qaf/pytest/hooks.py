@@ -9,6 +9,7 @@ from qaf.automation.core.test_base import is_verification_failed, get_bundle, \
 from qaf.automation.integration.result_updator import update_result
 from qaf.automation.integration.testcase_run_result import TestCaseRunResult
 from qaf.automation.keys.application_properties import ApplicationProperties
+from qaf.automation.util.csv_util import DataRow
 from qaf.pytest.pytest_utils import PyTestStatus, get_all_metadata
 
 
@@ -30,11 +31,21 @@ def pytest_fixture_setup(fixturedef, request):
         pass
 
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_pyfunc_call(pyfuncitem):
+    # test data row is created from data table when test gets executed
+    funcargs = pyfuncitem.funcargs
+    for name, value in funcargs.items():
+        if isinstance(value, DataRow):
+            funcargs[name] = value.get()
+    yield
+
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     set_test_context(item)
-    get_bundle().set_property(ApplicationProperties.CURRENT_TEST_NAME, item.name)
-    get_bundle().set_property(ApplicationProperties.CURRENT_TEST_RESULT, item)
+    get_bundle().set_runtime_property(ApplicationProperties.CURRENT_TEST_NAME, item.name)
+    get_bundle().set_runtime_property(ApplicationProperties.CURRENT_TEST_RESULT, item)
     outcome = yield
     report = outcome.get_result()
     setattr(item, "rep_" + report.when, report)
@@ -57,14 +68,14 @@ def report_result(node):
     # not isinstance(node, FixtureDef)
     testcase_run_result.isTest = report.when == "call"
 
-    testcase_run_result.checkPoints = deepcopy(get_checkpoint_results())
+    testcase_run_result.checkPoints = list(get_checkpoint_results())
     testcase_run_result.status = PyTestStatus.from_name(report.outcome).name
 
     # no need to report setup/teardown if nothing done
     if testcase_run_result.isTest or testcase_run_result.checkPoints or not report.passed:
         name = node.name if testcase_run_result.isTest else f'{node.name}::{report.when}'
         testcase_run_result.className = _get_class_name(node)
-        testcase_run_result.commandLogs = deepcopy(get_command_logs())
+        testcase_run_result.commandLogs = get_command_logs().copy()
         testcase_run_result.starttime = int(report.start * 1000)
         testcase_run_result.endtime = int(report.stop * 1000)
 
@@ -74,7 +85,9 @@ def report_result(node):
                                         "reference": six.text_type(node.nodeid),
                                         "description": node.originalname} | metadata_from_markers
         if testcase_run_result.isTest and hasattr(node, "callspec"):
-            testcase_run_result.testData = [node.callspec.params]
+            # updaters get rows, not references to rows
+            testcase_run_result.testData = [{k: v.get() if isinstance(v, DataRow) else v
+                                             for k, v in node.callspec.params.items()}]
         try:
             testcase_run_result.throwable = report.longreprtext
         except:
@@ -80,6 +80,9 @@ def get_metadata(markers):
             metadata.update(get_dp(marker))
         elif marker.args or marker.kwargs:
             metadata.update(marker.kwargs)
+            if isinstance(marker.kwargs.get("groups"), (list, tuple)):
+                # own copy to append to, marker value may be shared with other tests
+                metadata["groups"] = list(marker.kwargs["groups"])
             if marker.args:
                 if marker.name.lower() == "groups":
                     metadata["groups"] += list(marker.args)
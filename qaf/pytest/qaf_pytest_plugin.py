@@ -1,12 +1,15 @@
 import json
 import os
 import time
+from fnmatch import fnmatch
+from pathlib import Path
 from time import strftime
 
 import pytest
 
 from qaf.automation.core import get_bundle
 from qaf.automation.keys.application_properties import ApplicationProperties
+from qaf.automation.util.csv_util import DataTable, DataRow
 from qaf.automation.util.dataprovider_util import get_testdata
 from . import hooks
 from .pytest_utils import get_metadata, get_dp
@@ -80,8 +83,14 @@ def pytest_generate_tests(metafunc):
             meta_data = meta_data | {"method": testname, "class": classname}
             testdata = meta_data["JSON_DATA_TABLE"] if "JSON_DATA_TABLE" in meta_data \
                 else get_testdata(dataprovider or meta_data, meta_data)
-            ids = [o.get("tcId", o.get("summary")) for o in testdata]
-            metafunc.parametrize(argnames=param[0], argvalues=tuple(testdata), ids=tuple(ids))
+            if isinstance(testdata, DataTable):
+                # row is created from table when test gets executed
+                argvalues = tuple(DataRow(testdata, index) for index in range(len(testdata)))
+                ids = testdata.column_values("tcId", "summary")
+            else:
+                argvalues = tuple(testdata)
+                ids = [o.get("tcId", o.get("summary")) for o in testdata]
+            metafunc.parametrize(argnames=param[0], argvalues=argvalues, ids=tuple(ids))
         else:
             raise Exception("missing argument with name contains 'data' ")
 
@@ -92,6 +101,46 @@ def pytest_collect_file(parent, file_path):
         return BDD2File.from_parent(parent, path=file_path)
 
 
+def pytest_collection(session):
+    config = session.config
+    workers = get_bundle().get_int(ApplicationProperties.FEATURE_PARSE_WORKERS, 0)
+    # xdist worker collects its own share, parsing there is covered by feature cache,
+    # xdist controller doesn't collect at all
+    if workers == 1 or hasattr(config, "workerinput") or getattr(config.option, "dist", "no") != "no":
+        return None
+    feature_paths = list(_feature_paths(config))
+    if feature_paths:
+        from qaf.automation.bdd2.feature_cache import preparse_features
+        preparse_features(feature_paths, workers)
+    return None
+
+
+def pytest_collection_finish(session):
+    from qaf.automation.bdd2.feature_cache import discard_preparsed
+    discard_preparsed()
+
+
+def _feature_paths(config):
+    """
+    Feature files pytest is expected to collect for given args.
+    """
+    norecursedirs = config.getini("norecursedirs")
+    root = config.invocation_params.dir
+    for arg in config.args:
+        path = root / Path(arg.split("::")[0])
+        if path.is_file():
+            if path.suffix == ".feature":
+                yield path
+        elif path.is_dir():
+            for dir_path, dir_names, file_names in os.walk(path):
+                # prune in place, so that excluded directories are not walked
+                dir_names[:] = sorted(name for name in dir_names
+                                      if not any(fnmatch(name, pattern) for pattern in norecursedirs))
+                for file_name in sorted(file_names):
+                    if file_name.endswith(".feature"):
+                        yield Path(dir_path, file_name)
+
+
 def pytest_load_initial_conftests(early_config, parser, args):
     def determine(arg):
         if arg.startswith("-D"):
@@ -101,4 +150,5 @@ def pytest_load_initial_conftests(early_config, parser, args):
             return True
         return False
 
-    args[:] = [arg for arg in args if not determine(arg)]
+    with get_bundle().batch_update():
+        args[:] = [arg for arg in args if not determine(arg)]